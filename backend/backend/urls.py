@@ -16,10 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from bank.metrics import metrics_view
 
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path("api/", include("bank.urls"))
+    path("api/", include("bank.urls")),
+    path('metrics', metrics_view, name='metrics'),
 ]
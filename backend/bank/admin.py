@@ -1,7 +1,131 @@
 from django.contrib import admin
-from .models import User, Account, Transaction, Card
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import User, Account, Transaction, ArchivedTransaction, Card, DailyBalance, FeeSchedule, FeeTier, JournalEntry, Posting
+
+
+class LargeTablePaginator(Paginator):
+    """
+    Uses PostgreSQL's row estimate instead of COUNT(*) for unfiltered change lists,
+    which would otherwise scan the whole table on every page view.
+    """
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[self.object_list.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                        [self.object_list.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] > 0:
+                    return row[0]
+        return super().count
+
+
 # Register your models here.
-admin.site.register(User)
-admin.site.register(Transaction)
-admin.site.register(Account)
-admin.site.register(Card)
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ['id', 'username', 'first_name', 'last_name', 'phoneNumber', 'segment', 'is_active']
+    list_filter = ['segment']
+    search_fields = ['=phoneNumber', '=username', 'last_name']
+    show_full_result_count = False
+
+
+@admin.register(Account)
+class AccountAdmin(admin.ModelAdmin):
+    list_display = ['accountNumber', 'user', 'balance', 'balance_shards', 'lastEdited']
+    # Account.__str__ and the user column both read the user row
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    search_fields = ['=accountNumber', '=user__phoneNumber']
+    show_full_result_count = False
+
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'transaction_type', 'amount', 'fee', 'date', 'account', 'to_account']
+    list_select_related = ['account__user', 'to_account__user']
+    list_filter = ['transaction_type']
+    raw_id_fields = ['user', 'account', 'to_account', 'from_account']
+    search_fields = ['=account__accountNumber']
+    date_hierarchy = 'date'
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    # Archived rows are only read
+    list_display = ['id', 'transaction_type', 'amount', 'fee', 'date', 'account', 'to_account']
+    list_select_related = ['account__user', 'to_account__user']
+    list_filter = ['transaction_type']
+    raw_id_fields = ['user', 'account', 'to_account', 'from_account']
+    search_fields = ['=account__accountNumber']
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Card)
+class CardAdmin(admin.ModelAdmin):
+    list_display = ['card_number', 'user', 'card_Status', 'expiry_Date']
+    list_select_related = ['user']
+    list_filter = ['card_Status']
+    raw_id_fields = ['user']
+    search_fields = ['=card_number']
+    show_full_result_count = False
+
+
+@admin.register(DailyBalance)
+class DailyBalanceAdmin(admin.ModelAdmin):
+    list_display = ['account', 'date', 'closing_balance', 'total_in', 'total_out', 'total_fees', 'total_sent']
+    list_select_related = ['account__user']
+    raw_id_fields = ['account']
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+
+
+class PostingInline(admin.TabularInline):
+    model = Posting
+    fields = ['account', 'system_account', 'amount']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(JournalEntry)
+class JournalEntryAdmin(admin.ModelAdmin):
+    # The journal is append-only
+    list_display = ['id', 'kind', 'created_at', 'transaction_id']
+    inlines = [PostingInline]
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class FeeTierInline(admin.TabularInline):
+    model = FeeTier
+    fields = ['min_amount', 'rate', 'flat_fee', 'max_fee']
+    extra = 0
+
+
+@admin.register(FeeSchedule)
+class FeeScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'transaction_type', 'segment', 'is_active', 'updated_at']
+    list_filter = ['transaction_type', 'is_active']
+    inlines = [FeeTierInline]
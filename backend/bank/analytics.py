@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from django.db.models import Case, CharField, Count, DateField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Account, ArchivedTransaction, MonthlyRollup, Transaction
+from .signals import transactions_posted
+from .snapshots import CREDIT_TYPES, DEBIT_TYPES, _money
+from .upserts import add_or_insert
+
+# Spending analytics served from MonthlyRollup: one row per account, month,
+# transaction type and counterparty, folded forward as transactions are posted
+# so a report reads a few dozen rows instead of the account's history.
+
+ZERO = Decimal('0.00')
+MAX_MONTHS = 36
+
+
+def month_of(moment):
+    return timezone.localdate(moment).replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _counterparty_numbers(transactions):
+    """Account numbers of the other side of each transfer, loading only those not already on the rows."""
+    numbers = {}
+    missing = set()
+    for txn in transactions:
+        for field in ('to_account', 'from_account'):
+            account_id = getattr(txn, f'{field}_id')
+            if account_id is None:
+                continue
+            if Transaction._meta.get_field(field).is_cached(txn):
+                numbers[account_id] = getattr(txn, field).accountNumber
+            else:
+                missing.add(account_id)
+    missing -= numbers.keys()
+    if missing:
+        numbers.update(Account.objects.filter(pk__in=missing).values_list('pk', 'accountNumber'))
+    return numbers
+
+
+def counterparty_id(txn):
+    if txn.transaction_type == 'transfer':
+        return txn.to_account_id
+    if txn.transaction_type == 'received':
+        return txn.from_account_id
+    return None
+
+
+@receiver(transactions_posted)
+def record_monthly_rollups(sender, transactions, **kwargs):
+    """Fold freshly posted rows into their accounts' monthly rollups."""
+    numbers = _counterparty_numbers([txn for txn in transactions if counterparty_id(txn)])
+    rollups = defaultdict(lambda: [ZERO, ZERO, 0])
+    for txn in transactions:
+        other = counterparty_id(txn)
+        key = (txn.account_id, month_of(txn.date), txn.transaction_type, numbers.get(other, '') if other else '')
+        totals = rollups[key]
+        totals[0] += txn.amount
+        totals[1] += txn.fee
+        totals[2] += 1
+
+    for (account_id, month, transaction_type, counterparty), (amount, fees, count) in rollups.items():
+        add_or_insert(
+            MonthlyRollup,
+            {
+                'account_id': account_id, 'month': month,
+                'transaction_type': transaction_type, 'counterparty': counterparty,
+            },
+            {'amount': amount, 'fees': fees, 'transaction_count': count},
+        )
+
+
+def build_analytics(account, month_from, month_to, top=10):
+    """
+    Monthly inflow, outflow and fee totals of ``account`` between two months,
+    inclusive, broken down by transaction type, plus its ``top`` counterparties
+    by amount moved over the whole period.
+    """
+    rollups = MonthlyRollup.objects.filter(account=account, month__range=(month_from, month_to))
+    by_month = defaultdict(dict)
+    for row in rollups.values('month', 'transaction_type').annotate(
+        total=Sum('amount'), total_fees=Sum('fees'), count=Sum('transaction_count'),
+    ):
+        by_month[row['month']][row['transaction_type']] = row
+
+    months = []
+    month = month_from
+    while month <= month_to:
+        types = by_month.get(month, {})
+        inflow = sum((types[kind]['total'] for kind in CREDIT_TYPES if kind in types), ZERO)
+        outflow = sum((types[kind]['total'] for kind in DEBIT_TYPES if kind in types), ZERO)
+        fees = sum((row['total_fees'] or ZERO for row in types.values()), ZERO)
+        months.append({
+            'month': month.strftime('%Y-%m'),
+            'inflow': _money(inflow),
+            'outflow': _money(outflow),
+            'fees': _money(fees),
+            'net': _money(inflow - outflow - fees),
+            'transaction_count': sum(row['count'] for row in types.values()),
+            'by_type': {
+                kind: {'amount': _money(row['total']), 'transaction_count': row['count']}
+                for kind, row in sorted(types.items())
+            },
+        })
+        month = add_months(month, 1)
+
+    counterparties = (
+        rollups.exclude(counterparty='')
+        .values('counterparty')
+        .annotate(
+            sent=Sum('amount', filter=Q(transaction_type='transfer')),
+            received=Sum('amount', filter=Q(transaction_type='received')),
+            total=Sum('amount'),
+            count=Sum('transaction_count'),
+        )
+        .order_by('-total', 'counterparty')[:top]
+    )
+    return {
+        'account': account.accountNumber,
+        'month_from': month_from.strftime('%Y-%m'),
+        'month_to': month_to.strftime('%Y-%m'),
+        'months': months,
+        'top_counterparties': [
+            {
+                'account': row['counterparty'],
+                'sent': _money(row['sent'] or ZERO),
+                'received': _money(row['received'] or ZERO),
+                'transaction_count': row['count'],
+            }
+            for row in counterparties
+        ],
+    }
+
+
+def rebuild_monthly_rollups(account_ids):
+    """Recompute the rollups of the given accounts from their full history."""
+    # Lock the accounts so no posting folds into rows that are about to be replaced
+    list(Account.objects.select_for_update().filter(pk__in=account_ids).values_list('pk', flat=True))
+    counterparty = Coalesce(
+        Case(
+            When(transaction_type='transfer', then=F('to_account__accountNumber')),
+            When(transaction_type='received', then=F('from_account__accountNumber')),
+            output_field=CharField(),
+        ),
+        Value(''),
+    )
+    # Archived history counts too; a month can straddle the archive cutoff
+    totals = defaultdict(lambda: [ZERO, ZERO, 0])
+    for model in (Transaction, ArchivedTransaction):
+        groups = (
+            model.objects.filter(account_id__in=account_ids)
+            .annotate(month=TruncMonth('date', output_field=DateField()), counterparty=counterparty)
+            .values('account_id', 'month', 'transaction_type', 'counterparty')
+            .annotate(total=Sum('amount'), total_fees=Sum('fee'), count=Count('id'))
+            .order_by()
+        )
+        for row in groups:
+            key = (row['account_id'], row['month'], row['transaction_type'], row['counterparty'])
+            totals[key][0] += row['total'] or ZERO
+            totals[key][1] += row['total_fees'] or ZERO
+            totals[key][2] += row['count']
+    rollups = [
+        MonthlyRollup(
+            account_id=account_id, month=month, transaction_type=transaction_type,
+            counterparty=counterparty_number, amount=amount, fees=fees, transaction_count=count,
+        )
+        for (account_id, month, transaction_type, counterparty_number), (amount, fees, count) in totals.items()
+    ]
+    MonthlyRollup.objects.filter(account_id__in=account_ids).delete()
+    MonthlyRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
@@ -0,0 +1,122 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from ..authentication import ClaimsJWTAuthentication
+from ..cache import BALANCE, CARDS, PROFILE, aget_or_build, etag_matches
+from ..archive import aarchive_horizon, merge_newest_first, reaches_archive
+from ..models import Account, ArchivedTransaction, Card, Transaction, User
+from ..routers import aread_alias_for, reading_from
+from .pagination import KeysetPagination
+from .serializers import AccountSerializer, CardSerializer, TransactionSerializer, UserSerializer
+from .views import user_history
+
+# Async-native versions of the read endpoints for ASGI deployments. They use the
+# async ORM and cache APIs, so a request waiting on I/O doesn't hold a thread.
+
+
+class AsyncAPIView(View):
+    """
+    Authenticates with the bearer token, applies the same throttles as the DRF
+    views and renders DRF errors as JSON. Subclasses define ``async respond(request)``;
+    the class attributes named in ``required`` are checked when a subclass is
+    created, unless it is declared with ``abstract=True``.
+    """
+    http_method_names = ['get', 'head', 'options']
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    throttle_scope = None
+    required = ('respond',)
+
+    def __init_subclass__(cls, abstract=False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = [name for name in cls.required if getattr(cls, name, None) is None]
+        if missing and not abstract:
+            raise TypeError(f"{cls.__name__} must define {', '.join(missing)}.")
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            authenticated = await ClaimsJWTAuthentication().aauthenticate(request)
+            if authenticated is None:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+            request.user = authenticated[0]
+            await self.check_throttles(request)
+            return await self.respond(request)
+        except APIException as exc:
+            # Same body shape and Retry-After header as DRF's default exception handler
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+            response = JsonResponse(data, status=exc.status_code, safe=False)
+            if getattr(exc, 'wait', None):
+                response['Retry-After'] = '%d' % exc.wait
+            return response
+
+    async def check_throttles(self, request):
+        waits = []
+        for throttle in (throttle_class() for throttle_class in self.throttle_classes):
+            if not await throttle.aallow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+
+class CachedAsyncAPIView(AsyncAPIView, abstract=True):
+    """Serves ``async build(request)`` through the response cache kind ``cache_kind``."""
+    required = ('cache_kind', 'build')
+
+    async def respond(self, request):
+        data, etag = await aget_or_build(self.cache_kind, request.user.pk, lambda: self.build(request))
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = JsonResponse(data, safe=False)
+        response['ETag'] = etag
+        return response
+
+
+class AsyncBalanceView(CachedAsyncAPIView):
+    cache_kind = BALANCE
+
+    async def build(self, request):
+        accounts = Account.objects.filter(user_id=request.user.pk).with_visible_balance()
+        with reading_from(await aread_alias_for(request.user.pk)):
+            return AccountSerializer([account async for account in accounts], many=True).data
+
+
+class AsyncProfileView(CachedAsyncAPIView):
+    cache_kind = PROFILE
+
+    async def build(self, request):
+        return UserSerializer(await User.objects.aget(pk=request.user.pk)).data
+
+
+class AsyncCardView(CachedAsyncAPIView):
+    cache_kind = CARDS
+
+    async def build(self, request):
+        cards = Card.objects.filter(user_id=request.user.pk)
+        return CardSerializer([card async for card in cards], many=True).data
+
+
+class AsyncTransactionHistoryView(AsyncAPIView):
+    async def respond(self, request):
+        drf_request = Request(request)
+        queryset = user_history(Transaction, request.user.pk, drf_request.query_params)
+        paginator = KeysetPagination()
+        page = paginator.page_queryset(queryset, drf_request)
+        limit = paginator.page_size + 1
+        with reading_from(await aread_alias_for(request.user.pk)):
+            rows = [txn async for txn in page]
+            if reaches_archive(rows, limit, await aarchive_horizon()):
+                archived = paginator.page_queryset(
+                    user_history(ArchivedTransaction, request.user.pk, drf_request.query_params), drf_request
+                )
+                rows = merge_newest_first(rows, [txn async for txn in archived], limit)
+            rows = paginator.paginate_rows(rows)
+        data = TransactionSerializer(rows, many=True).data
+        return JsonResponse(paginator.get_paginated_response(data).data, encoder=DjangoJSONEncoder)
@@ -0,0 +1,96 @@
+import base64
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from ..archive import archive_horizon, merge_newest_first, reaches_archive
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination over (date, id).
+
+    The cursor is the (date, id) of the last row on the previous page, so every
+    page is one index range scan no matter how deep into the history it is.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = list(self.page_queryset(queryset, request))
+        # Views over archived history also say where the older rows live
+        get_archived = getattr(view, 'get_archived_queryset', None)
+        if get_archived is not None and reaches_archive(rows, self.page_size + 1, archive_horizon()):
+            archived = list(self.page_queryset(get_archived(), request))
+            rows = merge_newest_first(rows, archived, self.page_size + 1)
+        return self.paginate_rows(rows)
+
+    def page_queryset(self, queryset, request):
+        """The unevaluated queryset for the requested page, plus one row to detect a next page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            date, pk = position
+            queryset = queryset.filter(Q(date__lt=date) | Q(date=date, id__lt=pk))
+        return queryset.order_by(*self.ordering)[:self.page_size + 1]
+
+    def paginate_rows(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = (rows[-1].date, rows[-1].pk) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        date, pk = self.next_position
+        token = base64.urlsafe_b64encode(f"{date.isoformat()}|{pk}".encode()).decode()
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = token
+        return self.request.build_absolute_uri(f"{self.request.path}?{params.urlencode()}")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            date, pk = base64.urlsafe_b64decode(token.encode()).decode().split('|')
+            pk = uuid.UUID(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor.")
+        date = parse_datetime(date)
+        if date is None:
+            raise NotFound("Invalid cursor.")
+        return date, pk
@@ -1,6 +1,23 @@
+from decimal import Decimal
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from ..models import User, Transaction, Account, Card
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from ..metrics import serializer_timer
+from ..models import User, Transaction, Account, Card, generate_Account_number
+from ..numbering import account_numbers
+
+
+# Response serializers add the time spent building `.data` to the request metrics
+class TimedDataMixin:
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
 
 # Register Serializer
 class RegisterSerializer(serializers.ModelSerializer):
@@ -11,15 +28,24 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['username', 'first_name', 'last_name', 'phoneNumber', 'email', 'address', 'password']
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
+        # Hashing and the account number come first: inside the transaction the
+        # hash would hold the write lock, and the allocator would skip its block
+        user = User(
+            username=User.normalize_username(validated_data['username']),
             first_name=validated_data['first_name'],
             last_name=validated_data['last_name'],
             phoneNumber=validated_data['phoneNumber'],
-            email=validated_data['email'],
+            email=User.objects.normalize_email(validated_data['email']),
             address=validated_data['address'],
-            password=validated_data['password']
+            password=make_password(validated_data['password']),
         )
+        account = Account(user=user, accountNumber=generate_Account_number(account_numbers.allocate()))
+        # The user, its account and the outbox event commit together. The account
+        # goes in first, so the post_save receiver finds it and doesn't make
+        # another; the foreign key to the user is only checked at commit.
+        with transaction.atomic():
+            account.save()
+            user.save()
         return user
 
 
@@ -45,24 +71,26 @@ class LoginSerializer(serializers.Serializer):
 
 
 # User Serializer
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'phoneNumber', 'email', 'address']
 
 
 # Card Serializer
-class CardSerializer(serializers.ModelSerializer):
+class CardSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Card
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'user', 'card_number', 'card_Status', 'created_on', 'expiry_Date']
         read_only_fields = ['card_number', 'created_on', 'expiry_Date']
 
 
 # Transaction Serializer
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Transaction
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'account', 'to_account', 'user', 'date', 'amount', 'transaction_type', 'fee']
         read_only_fields = ['id', 'date', 'fee']
 
@@ -86,12 +114,22 @@ class TransactionSerializer(serializers.ModelSerializer):
 
 
 # Balance Serializer
-class AccountSerializer(serializers.ModelSerializer):
+class AccountSerializer(TimedDataMixin, serializers.ModelSerializer):
+    # Includes balance shards; querysets annotated with_visible_balance() avoid a query per account
+    balance = serializers.SerializerMethodField()
+
     class Meta:
         model = Account
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'accountNumber', 'balance','user', 'lastEdited']
         read_only_fields = ['accountNumber', 'lastEdited']
 
+    def get_balance(self, obj):
+        balance = getattr(obj, 'visible_balance', None)
+        if balance is None:
+            balance = obj.total_balance()
+        return str(balance.quantize(Decimal('0.01')))
+
 
 # Update Profile Serializer
 class UpdateProfileSerializer(serializers.ModelSerializer):
@@ -1,24 +1,106 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.exceptions import ValidationError
-from ..models import User, Transaction, Account, Card
+from django.core.exceptions import ValidationError as DjangoValidationError
+from ..models import User, Transaction, ArchivedTransaction, Account, Card
+from ..analytics import MAX_MONTHS, add_months, build_analytics
+from ..archive import merge_oldest_first
+from ..authentication import BankRefreshToken
+from ..cache import BALANCE, CARDS, PROFILE, etag_matches, get_or_build
+from ..exports import CONTENT_TYPES, FORMATS, export_rows, render_lines
+from ..fees import fee_segment, preview_fees
+from ..idempotency import run_idempotent
+from ..onboarding import import_chunk, read_chunks
+from ..routers import read_alias_for, reading_from
+from ..snapshots import build_statement
+from ..transfers import CENTS, execute_batch
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, CardSerializer, TransactionSerializer, AccountSerializer, UpdateProfileSerializer
 
+# Helper to read a date/datetime query parameter as an aware datetime.
+# Plain dates used as an upper bound cover the whole day.
+def parse_date_param(value, end_of_day=False):
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+        day = None if moment else parse_date(value)
+    except ValueError:
+        moment = day = None
+    if moment is None:
+        if day is None:
+            raise ValidationError(f"Invalid date: {value}")
+        if end_of_day:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+# Columns TransactionSerializer reads; history querysets load nothing else
+HISTORY_FIELDS = ['id', 'account', 'to_account', 'user', 'date', 'amount', 'transaction_type', 'fee']
+
+# Helper applying the history endpoints' date_from/date_to/type filters
+def filter_history(queryset, params):
+    date_from = parse_date_param(params.get('date_from'))
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    date_to = parse_date_param(params.get('date_to'), end_of_day=True)
+    if date_to:
+        queryset = queryset.filter(date__lt=date_to)
+    if params.get('type'):
+        queryset = queryset.filter(transaction_type=params['type'])
+    return queryset.order_by("-date", "-id")
+
+# A user's filtered history in one table: Transaction, or ArchivedTransaction for older rows
+def user_history(model, user_id, params):
+    return filter_history(model.objects.filter(user_id=user_id).only(*HISTORY_FIELDS), params)
+
 # Helper function to generate JWT tokens
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = BankRefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
     }
 
+# Serves a per-user cached copy of the response, with ETag/If-None-Match support.
+# Invalidation lives in bank/cache.py.
+class CachedResponseMixin:
+    cache_kind = None
+
+    def get(self, request, *args, **kwargs):
+        render = super().get
+        data, etag = get_or_build(
+            self.cache_kind, request.user.pk, lambda: render(request, *args, **kwargs).data
+        )
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
+
+# Sends the view's reads to a replica unless the user was just pinned to the primary
+class ReplicaReadMixin:
+    def get(self, request, *args, **kwargs):
+        with reading_from(read_alias_for(request.user.pk)):
+            return super().get(request, *args, **kwargs)
+
 # Register View
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
+    throttle_scope = 'signup'
 
     def create(self, request, *args, **kwargs):
         data=request.data.copy()
@@ -33,6 +115,41 @@ class RegisterView(generics.CreateAPIView):
             "message": "User registered successfully. Please log in."
         }, status=status.HTTP_201_CREATED)
 
+# Bulk User Import View
+# Admin upload of a customer CSV of up to BULK_IMPORT_MAX_ROWS rows, imported in
+# one chunk. Larger files go through the import_users command, which hashes
+# passwords in a process pool and commits chunk by chunk.
+class BulkUserImportView(APIView):
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError("A CSV file is required.")
+
+        limit = settings.BULK_IMPORT_MAX_ROWS
+        # The whole upload is read before anything is imported, so a bad file
+        # is rejected without leaving part of it committed
+        try:
+            rows = next(read_chunks(io.TextIOWrapper(upload, encoding='utf-8-sig', newline=''), limit + 1), [])
+        except (UnicodeDecodeError, ValueError) as exc:
+            return Response({"detail": str(exc), "imported": 0}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > limit:
+            return Response({
+                "detail": f"At most {limit} rows can be uploaded; import larger files with the import_users command.",
+                "imported": 0,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # PBKDF2 and scrypt hashing release the GIL, so threads hash in parallel
+        with ThreadPoolExecutor(max_workers=settings.BULK_IMPORT_HASH_THREADS) as pool:
+            imported, errors = import_chunk(rows, pool.map)
+        return Response({
+            "imported": imported,
+            "rejected": len(errors),
+            "errors": [{"line": line, "message": message} for line, message in errors[:100]],
+        }, status=status.HTTP_200_OK)
+
 # Update Profile View
 class UpdateProfileView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
@@ -52,15 +169,19 @@ class UpdateProfileView(generics.UpdateAPIView):
             }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class GetProfileView(generics.RetrieveAPIView):
+class GetProfileView(CachedResponseMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    cache_kind = PROFILE
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries token claims on read-only requests
+        return User.objects.get(pk=self.request.user.pk)
 
 # Login View
 class LoginView(APIView):
+    throttle_scope = 'login'
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -74,13 +195,16 @@ class LoginView(APIView):
             "user": UserSerializer(user).data
         }, status=status.HTTP_200_OK)
 
-# Transaction List/Create View
-# Transaction List/Create View
 # Transaction List/Create View
 class TransactionListCreateView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'transfer'
 
     def post(self, request, *args, **kwargs):
+        # Retries carrying the same Idempotency-Key get the original response
+        return run_idempotent(request, lambda: self.create_transaction(request))
+
+    def create_transaction(self, request):
         data = request.data.copy()  # Make a copy of the incoming data to work with
 
         # Extract account and to_account from request data
@@ -109,7 +233,10 @@ class TransactionListCreateView(APIView):
         serializer = TransactionSerializer(data=data)
         if serializer.is_valid():
             # Save the transaction if data is valid
-            transaction = serializer.save()
+            try:
+                transaction = serializer.save()
+            except DjangoValidationError as exc:
+                return Response({"message": exc.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
             return Response({
                 "message": "Transaction created successfully",
                 "transaction": serializer.data
@@ -118,29 +245,184 @@ class TransactionListCreateView(APIView):
             # If the serializer is invalid, return validation errors
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+# Batch Transfer View
+class BatchTransactionView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+    throttle_scope = 'batch-transfer'
+
+    def post(self, request, *args, **kwargs):
+        return run_idempotent(request, lambda: self.create_batch(request))
+
+    def create_batch(self, request):
+        items = request.data
+        # A JSON body may be the list itself or wrap it as {"transfers": [...]}
+        if isinstance(items, dict):
+            items = items.get('transfers')
+        if not isinstance(items, list) or not items:
+            raise ValidationError("A non-empty list of transfers is required.")
+
+        max_items = getattr(settings, 'BATCH_TRANSFER_MAX_ITEMS', 50000)
+        if len(items) > max_items:
+            raise ValidationError(f"A batch can contain at most {max_items} transfers.")
+
+        results = execute_batch(request.user, items)
+        accepted = sum(1 for result in results if result['status'] == 'ok')
+        return Response({
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
+# Fee Preview View
+class FeePreviewView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        transaction_type = request.data.get('transaction_type', 'transfer')
+        if transaction_type not in ('withdrawal', 'transfer'):
+            raise ValidationError("transaction_type must be 'withdrawal' or 'transfer'.")
+        amounts = request.data.get('amounts')
+        if not isinstance(amounts, list) or not amounts:
+            raise ValidationError("A non-empty list of amounts is required.")
+        max_amounts = settings.FEE_PREVIEW_MAX_AMOUNTS
+        if len(amounts) > max_amounts:
+            raise ValidationError(f"At most {max_amounts} amounts can be quoted at once.")
+
+        parsed = []
+        for index, amount in enumerate(amounts):
+            try:
+                amount = Decimal(str(amount)).quantize(CENTS)
+            except ArithmeticError:
+                amount = None
+            if amount is None or not amount.is_finite():
+                raise ValidationError(f"Amount {index} is not a valid number.")
+            if amount < 0:
+                raise ValidationError(f"Amount {index} must not be negative.")
+            parsed.append(amount)
+
+        quotes = preview_fees(parsed, transaction_type, fee_segment(request.user.pk, transaction_type))
+        return Response({
+            "transaction_type": transaction_type,
+            "quotes": [
+                {"amount": str(amount), "fee": str(fee), "total": str(amount + fee)}
+                for amount, fee in quotes
+            ],
+        }, status=status.HTTP_200_OK)
+
 # Balance Retrieve/Update View
-class BalanceRetrieveUpdateView(generics.ListAPIView):
+class BalanceRetrieveUpdateView(CachedResponseMixin, ReplicaReadMixin, generics.ListAPIView):
     
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticated]
+    cache_kind = BALANCE
     
     def get_queryset(self):
-        print(f"Your ballance is :{Account.objects.filter(user=self.request.user)}")
-        return Account.objects.filter(user=self.request.user)
+        return Account.objects.filter(user_id=self.request.user.pk).with_visible_balance()
+
+# Statement View
+class StatementView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        accounts = Account.objects.filter(user_id=request.user.pk)
+        account_number = request.query_params.get('account')
+        if account_number:
+            accounts = accounts.filter(accountNumber=account_number)
+        account = accounts.order_by('pk').first()
+        if account is None:
+            raise ValidationError("Account not found.")
+
+        today = timezone.localdate()
+        date_from = self.parse_day(request, 'date_from') or today.replace(day=1)
+        date_to = self.parse_day(request, 'date_to') or today
+        if date_from > date_to:
+            raise ValidationError("date_from must not be after date_to.")
+
+        return Response(build_statement(account, date_from, date_to), status=status.HTTP_200_OK)
+
+    def parse_day(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({name: ["Must be a valid YYYY-MM-DD date."]})
+        return day
+
+# Spending Analytics View
+class AnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        with reading_from(read_alias_for(request.user.pk)):
+            accounts = Account.objects.filter(user_id=request.user.pk)
+            account_number = request.query_params.get('account')
+            if account_number:
+                accounts = accounts.filter(accountNumber=account_number)
+            account = accounts.order_by('pk').first()
+            if account is None:
+                raise ValidationError("Account not found.")
+
+            try:
+                month_to = self.parse_month(request.query_params.get('month_to')) or timezone.localdate().replace(day=1)
+                month_from = self.parse_month(request.query_params.get('month_from')) or add_months(month_to, -5)
+            except ValueError:
+                raise ValidationError("Months must be valid YYYY-MM values.")
+            if month_from > month_to:
+                raise ValidationError("month_from must not be after month_to.")
+            if add_months(month_from, MAX_MONTHS) <= month_to:
+                raise ValidationError(f"At most {MAX_MONTHS} months can be requested.")
+            try:
+                top = min(int(request.query_params.get('top', 10)), 50)
+            except ValueError:
+                raise ValidationError("top must be a number.")
+
+            return Response(build_analytics(account, month_from, month_to, max(top, 0)), status=status.HTTP_200_OK)
+
+    def parse_month(self, value):
+        return datetime.strptime(value, '%Y-%m').date() if value else None
 
 # User Transaction List View
-class UserTransactionListView(generics.ListAPIView):
+class UserTransactionListView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
     
 
+    pagination_class = KeysetPagination
+
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user).order_by("-date")
+        return user_history(Transaction, self.request.user.pk, self.request.query_params)
+
+    def get_archived_queryset(self):
+        return user_history(ArchivedTransaction, self.request.user.pk, self.request.query_params)
+
+# Transaction Export View
+# Streams the filtered history as CSV or NDJSON without building it in memory.
+# The format parameter is `fmt` because DRF reserves `format` for content negotiation.
+class TransactionExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.query_params.get('fmt', 'csv')
+        if fmt not in FORMATS:
+            raise ValidationError(f"fmt must be one of: {', '.join(FORMATS)}.")
+
+        hot = filter_history(Transaction.objects.filter(user_id=request.user.pk), request.query_params)
+        archived = filter_history(ArchivedTransaction.objects.filter(user_id=request.user.pk), request.query_params)
+        rows = merge_oldest_first(export_rows(hot), export_rows(archived))
+        response = StreamingHttpResponse(render_lines(rows, fmt), content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="transactions.{fmt}"'
+        return response
 
 # Card List View
-class CardView(generics.ListAPIView):
+class CardView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = CardSerializer
     permission_classes = [IsAuthenticated]
+    cache_kind = CARDS
 
     def get_queryset(self):
-        return Card.objects.filter(user=self.request.user)
+        return Card.objects.filter(user_id=self.request.user.pk)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class BankConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bank'
+
+    def ready(self):
+        # Connect the signal receivers defined outside models.py
+        from . import analytics, authentication, cache, fees, fraud, ledger, outbox, routers, snapshots  # noqa: F401
@@ -0,0 +1,99 @@
+import heapq
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max
+
+from .models import ArchivedTransaction, Transaction
+
+# Cold-tier archival of old transactions. archive_before() moves rows older than
+# a cutoff from Transaction into ArchivedTransaction a chunk at a time, so the
+# hot table and its indexes only hold recent history.
+#
+# Readers merge both tables. The archive horizon (the newest archived date) is
+# kept in the shared cache, which lets a history page skip the archive query
+# whenever its hot rows are all newer than anything archived. An empty archive
+# is looked up again on every read, an indexed MAX() over no rows.
+
+ARCHIVED_FIELDS = [field.attname for field in Transaction._meta.concrete_fields]
+HORIZON_KEY = 'bank:archive:horizon'
+
+
+def _cache():
+    return caches[settings.BANK_CACHE_ALIAS]
+
+
+def archive_horizon():
+    """The date of the newest archived row, or None while nothing is archived."""
+    horizon = _cache().get(HORIZON_KEY)
+    if horizon is None:
+        horizon = ArchivedTransaction.objects.aggregate(newest=Max('date'))['newest']
+        # An empty archive isn't cached: rows archived meanwhile must not be skipped for a TTL
+        if horizon is not None:
+            _cache().set(HORIZON_KEY, horizon, settings.TRANSACTION_ARCHIVE_HORIZON_TTL)
+    return horizon
+
+
+async def aarchive_horizon():
+    """Async archive_horizon()."""
+    horizon = await _cache().aget(HORIZON_KEY)
+    if horizon is None:
+        horizon = (await ArchivedTransaction.objects.aaggregate(newest=Max('date')))['newest']
+        if horizon is not None:
+            await _cache().aset(HORIZON_KEY, horizon, settings.TRANSACTION_ARCHIVE_HORIZON_TTL)
+    return horizon
+
+
+def reaches_archive(rows, limit, horizon):
+    """
+    Whether a newest-first page of ``limit`` hot rows may be missing archived ones:
+    the hot rows ran out, or the page reaches back past the horizon.
+    """
+    if horizon is None:
+        return False
+    return len(rows) < limit or rows[-1].date <= horizon
+
+
+def merge_newest_first(hot, archived, limit):
+    """Merge two newest-first row lists into one page, dropping rows seen in both mid-move."""
+    seen = set()
+    merged = []
+    for row in heapq.merge(hot, archived, key=lambda row: (row.date, row.pk), reverse=True):
+        if row.pk not in seen:
+            seen.add(row.pk)
+            merged.append(row)
+            if len(merged) == limit:
+                break
+    return merged
+
+
+def merge_oldest_first(hot, archived):
+    """
+    Merge two oldest-first streams of export tuples, whose first two columns are
+    id and date, lazily and without repeating rows seen in both mid-move.
+    """
+    previous = None
+    for row in heapq.merge(archived, hot, key=lambda row: (row[1], row[0])):
+        if row[0] != previous:
+            previous = row[0]
+            yield row
+
+
+def archive_before(cutoff, chunk_size=5000):
+    """
+    Move transactions dated before ``cutoff`` into the archive, oldest first and
+    one database transaction per chunk. Yields the number of rows moved per chunk.
+    """
+    rows = Transaction.objects.filter(date__lt=cutoff).order_by('date', 'id').values(*ARCHIVED_FIELDS)
+    while True:
+        with transaction.atomic():
+            chunk = list(rows[:chunk_size])
+            if not chunk:
+                return
+            # Raised before the rows leave the hot table, so readers never skip them
+            horizon = max(chunk[-1]['date'], archive_horizon() or chunk[-1]['date'])
+            _cache().set(HORIZON_KEY, horizon, settings.TRANSACTION_ARCHIVE_HORIZON_TTL)
+            ArchivedTransaction.objects.bulk_create([ArchivedTransaction(**row) for row in chunk])
+            Transaction.objects.filter(pk__in=[row['id'] for row in chunk]).delete()
+        yield len(chunk)
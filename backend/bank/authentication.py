@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+PHONE_CLAIM = 'phone'
+ACTIVE_CLAIM = 'active'
+VERSION_CLAIM = 'ver'
+
+
+class BankRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the claims read-only endpoints need."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[PHONE_CLAIM] = user.phoneNumber
+        token[ACTIVE_CLAIM] = user.is_active
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class ClaimsTokenUser(TokenUser):
+    """Stateless user built from access token claims; it only knows its id and phone number."""
+
+    @cached_property
+    def phoneNumber(self):
+        return self.token[PHONE_CLAIM]
+
+    @cached_property
+    def is_active(self):
+        return self.token[ACTIVE_CLAIM]
+
+    @cached_property
+    def token_version(self):
+        return self.token[VERSION_CLAIM]
+
+
+class TokenRevocations:
+    """
+    Small in-process LRU of users whose tokens were revoked or who were deactivated.
+
+    Entries come from the shared Django cache (written whenever a user is saved) and
+    are kept locally for TOKEN_REVOCATION_CACHE_TTL seconds, so checking a token
+    normally touches neither the database nor the cache backend. A user missing
+    from the cache is read from the database; a miss never counts as valid.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, user_id):
+        return f"bank:tokver:{user_id}"
+
+    def record(self, user):
+        state = (user.token_version, user.is_active)
+        lifetime = settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+        caches[settings.BANK_CACHE_ALIAS].set(self.key(user.pk), state, lifetime)
+        self._store(user.pk, state)
+
+    def is_revoked(self, user_id, version):
+        found, state = self._local(user_id)
+        if not found:
+            state = caches[settings.BANK_CACHE_ALIAS].get(self.key(user_id))
+            if state is None:
+                state = self._loaded(User.objects.filter(pk=user_id).values_list('token_version', 'is_active').first())
+                caches[settings.BANK_CACHE_ALIAS].add(self.key(user_id), state, settings.TOKEN_REVOCATION_CACHE_TTL)
+            self._store(user_id, state)
+        return self._revokes(state, version)
+
+    async def ais_revoked(self, user_id, version):
+        found, state = self._local(user_id)
+        if not found:
+            state = await caches[settings.BANK_CACHE_ALIAS].aget(self.key(user_id))
+            if state is None:
+                state = self._loaded(
+                    await User.objects.filter(pk=user_id).values_list('token_version', 'is_active').afirst()
+                )
+                await caches[settings.BANK_CACHE_ALIAS].aadd(self.key(user_id), state, settings.TOKEN_REVOCATION_CACHE_TTL)
+            self._store(user_id, state)
+        return self._revokes(state, version)
+
+    def _loaded(self, row):
+        # Users that no longer exist count as deactivated. The state read here is
+        # only add()ed to the shared cache for a short while, so it never replaces
+        # one recorded by a save and goes stale quickly where the cache isn't shared.
+        return tuple(row) if row is not None else (0, False)
+
+    def _revokes(self, state, version):
+        current_version, is_active = state
+        return not is_active or version < current_version
+
+    def _local(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return True, entry[0]
+        return False, None
+
+    def _store(self, user_id, state):
+        with self._lock:
+            self._entries[user_id] = (state, time.monotonic() + settings.TOKEN_REVOCATION_CACHE_TTL)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.TOKEN_REVOCATION_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+
+revocations = TokenRevocations()
+
+
+@receiver(post_save, sender=User)
+def record_token_state(sender, instance, **kwargs):
+    revocations.record(instance)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the token's claims on read-only requests.
+
+    GET/HEAD/OPTIONS requests get a ClaimsTokenUser without loading the user row;
+    writes still load the user and check the token version against it. Tokens
+    issued before the claims existed fall back to the database on every request.
+    """
+
+    def authenticate(self, request):
+        self.read_only = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        version = validated_token.get(VERSION_CLAIM)
+        if version is None:
+            return super().get_user(validated_token)
+
+        self.check_revoked(validated_token, revocations.is_revoked(self.token_user_id(validated_token), version))
+        if self.read_only:
+            return ClaimsTokenUser(validated_token)
+
+        user = super().get_user(validated_token)
+        if user.token_version != version:
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+        return user
+
+    async def aauthenticate(self, request):
+        """Async authenticate() for the read-only views in bank/api/async_views.py."""
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        version = validated_token.get(VERSION_CLAIM)
+        if version is None:
+            user = await sync_to_async(super().get_user)(validated_token)
+            return user, validated_token
+
+        user_id = self.token_user_id(validated_token)
+        self.check_revoked(validated_token, await revocations.ais_revoked(user_id, version))
+        return ClaimsTokenUser(validated_token), validated_token
+
+    def token_user_id(self, validated_token):
+        return validated_token.get(api_settings.USER_ID_CLAIM)
+
+    def check_revoked(self, validated_token, revoked):
+        if revoked or not validated_token.get(ACTIVE_CLAIM):
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
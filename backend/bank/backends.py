@@ -1,15 +1,28 @@
 from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
 from bank.models import User
 
 
 
 class PhoneNumberBackend(ModelBackend):
-    def authenticate(self, request, phoneNumber, password, **kwargs):
-        try:
-            user = User.objects.get(phoneNumber=phoneNumber)
-        except User.DoesNotExist:
+    """
+    Authenticates by phone number or username with a single indexed query,
+    so it can replace ModelBackend instead of running alongside it.
+    """
+    def authenticate(self, request, username=None, password=None, phoneNumber=None, **kwargs):
+        identifier = phoneNumber or username
+        if identifier is None or password is None:
             return None
-        
-        if user.check_password(password):
+
+        candidates = list(User.objects.filter(Q(phoneNumber=identifier) | Q(username=identifier))[:2])
+        if not candidates:
+            # Run the hasher anyway so unknown users take as long as wrong passwords
+            User().set_password(password)
+            return None
+
+        # A phone number match wins over another user's username
+        user = next((u for u in candidates if u.phoneNumber == identifier), candidates[0])
+        # check_password rehashes with the preferred hasher when the stored hash is outdated
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
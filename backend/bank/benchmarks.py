@@ -0,0 +1,132 @@
+import random
+import timeit
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Account, Transaction, User, generate_Account_number, generate_card_number, generate_numeric_id
+from .numbering import account_numbers
+from .fees import calculate_fee
+from .transfers import CENTS, MINIMUM_AMOUNT, execute_batch, post_transactions
+
+# Shared pieces of the benchmark commands: bulk fixtures, percentile reporting,
+# the balances-plus-fees invariant and a few in-process micro-benchmarks.
+
+
+def seed_users(count, password, opening_balance, phone_prefix='5'):
+    """
+    Create ``count`` users, each with one funded account, using bulk inserts.
+
+    The password is hashed once and shared, and the opening balances are posted
+    as ordinary deposits so the journal and daily snapshots stay consistent.
+    Returns the accounts with their users attached.
+    """
+    encoded = make_password(password)
+    start = random.randint(0, 10**9 - count)
+    users = []
+    for offset in range(count):
+        phone = f"{phone_prefix}{start + offset:09d}"
+        users.append(User(
+            id=generate_numeric_id(), username=phone, phoneNumber=phone, password=encoded,
+            first_name="Bench", last_name=f"User {offset}",
+        ))
+
+    with transaction.atomic():
+        # bulk_create skips the post_save receiver, so accounts are created here too
+        User.objects.bulk_create(users, batch_size=500)
+        serials = account_numbers.allocate_range(count)
+        accounts = [
+            Account(user=user, accountNumber=generate_Account_number(serial), balance=opening_balance)
+            for user, serial in zip(users, serials)
+        ]
+        Account.objects.bulk_create(accounts, batch_size=500)
+        deposits = [
+            Transaction(account=account, user_id=account.user_id, amount=opening_balance, transaction_type='deposit')
+            for account in accounts
+        ]
+        post_transactions(deposits, accounts, batch_size=500)
+    return accounts
+
+
+def seed_history(accounts, per_account, amount=MINIMUM_AMOUNT):
+    """Give every account ``per_account`` outgoing transfers to random peers, one batch per user."""
+    numbers = [account.accountNumber for account in accounts]
+    for account in accounts:
+        items = [
+            {'from_account': account.accountNumber, 'to_account': random.choice(numbers), 'amount': str(amount)}
+            for _ in range(per_account)
+        ]
+        execute_batch(account.user, items)
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of ``samples``, as a dict keyed by percentile."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {point: 0.0 for point in points}
+    return {point: ordered[max(0, -(-len(ordered) * point // 100) - 1)] for point in points}
+
+
+def to_cents(total):
+    """Round a SUM() over money to the cent; SQLite sums decimals as floats."""
+    return Decimal(total or 0).quantize(CENTS)
+
+
+def conservation_problems(account_ids):
+    """
+    Check that money moving between the given accounts was neither created nor lost:
+    deposits minus withdrawals must equal their balances plus the fees they paid.
+    """
+    rows = Transaction.objects.filter(account_id__in=account_ids)
+
+    def total(queryset, field):
+        return queryset.aggregate(total=Sum(field))['total'] or Decimal('0.00')
+
+    deposited = total(rows.filter(transaction_type='deposit'), 'amount')
+    withdrawn = total(rows.filter(transaction_type='withdrawal'), 'amount')
+    fees = total(rows, 'fee')
+    balances = sum(
+        (account.visible_balance for account in Account.objects.filter(pk__in=account_ids).with_visible_balance()),
+        Decimal('0.00'),
+    )
+    problems = []
+    # SQLite sums decimals as floats, so compare to the cent
+    if abs(deposited - withdrawn - balances - fees) >= Decimal('0.005'):
+        problems.append(f"deposits {deposited} - withdrawals {withdrawn} != balances {balances} + fees {fees}")
+    negative = Account.objects.filter(pk__in=account_ids, balance__lt=0).count()
+    if negative:
+        problems.append(f"{negative} accounts went negative")
+    return problems
+
+
+def _serialize_history():
+    from .api.serializers import TransactionSerializer
+    rows = [
+        Transaction(account_id=1, to_account_id=2, user_id='1', amount=Decimal('10.00'), transaction_type='transfer')
+        for _ in range(50)
+    ]
+    return lambda: TransactionSerializer(rows, many=True).data
+
+
+def _journal_postings():
+    from .ledger import journal_postings
+    txn = Transaction(account_id=1, to_account_id=2, amount=Decimal('10.00'), fee=Decimal('0.20'), transaction_type='transfer')
+    return lambda: journal_postings(txn)
+
+
+# name -> factory returning the callable to time
+MICRO_BENCHMARKS = {
+    'calculate_fee': lambda: lambda: calculate_fee(Decimal('1234.56')),
+    'generate_card_number': lambda: lambda: generate_card_number(123456789),
+    'serialize_history_page': _serialize_history,
+    'journal_postings': _journal_postings,
+}
+
+
+def run_micro_benchmarks(number=1000, repeat=5):
+    """Yield ``(name, best seconds per call)`` for each micro-benchmark."""
+    for name, factory in MICRO_BENCHMARKS.items():
+        timings = timeit.repeat(factory(), number=number, repeat=repeat)
+        yield name, min(timings) / number
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import parse_etags
+
+from .models import Account, Card, User
+from .signals import transactions_posted
+
+BALANCE = 'balance'
+PROFILE = 'profile'
+CARDS = 'cards'
+
+
+def _cache():
+    return caches[settings.BANK_CACHE_ALIAS]
+
+
+# Each user's responses of one kind live under a generation number that invalidate()
+# bumps. A reader picks the generation before it builds, so a build that raced a
+# write can only land under a generation nobody reads any more.
+
+def generation_key(kind, user_id):
+    return f"bank:{kind}:{user_id}:generation"
+
+
+def cache_key(kind, user_id, generation):
+    return f"bank:{kind}:{user_id}:{generation}"
+
+
+def _seed():
+    # Seeded from the clock, so a generation lost to eviction never comes back as an old one
+    return time.time_ns()
+
+
+def _generation(kind, user_id):
+    key = generation_key(kind, user_id)
+    generation = _cache().get(key)
+    if generation is None:
+        _cache().add(key, _seed(), None)
+        generation = _cache().get(key)
+    return generation
+
+
+async def _ageneration(kind, user_id):
+    key = generation_key(kind, user_id)
+    generation = await _cache().aget(key)
+    if generation is None:
+        await _cache().aadd(key, _seed(), None)
+        generation = await _cache().aget(key)
+    return generation
+
+
+def get_or_build(kind, user_id, build):
+    """
+    Return ``(data, etag)`` for one user's cached response, building it on a miss.
+    ``build`` returns the serialized response data.
+    """
+    key = cache_key(kind, user_id, _generation(kind, user_id))
+    entry = _cache().get(key)
+    if entry is None:
+        entry = _entry(build())
+        _cache().set(key, entry, settings.BANK_CACHE_TIMEOUT)
+    return entry
+
+
+async def aget_or_build(kind, user_id, abuild):
+    """Async get_or_build(); ``abuild`` is a coroutine function."""
+    key = cache_key(kind, user_id, await _ageneration(kind, user_id))
+    entry = await _cache().aget(key)
+    if entry is None:
+        entry = _entry(await abuild())
+        await _cache().aset(key, entry, settings.BANK_CACHE_TIMEOUT)
+    return entry
+
+
+def _entry(data):
+    # Serializers always emit fields in the same order, so the payload is stable as is
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return json.loads(payload), '"%s"' % hashlib.md5(payload.encode()).hexdigest()
+
+
+def etag_matches(etag, if_none_match):
+    """Whether an If-None-Match header value names ``etag`` (or is ``*``)."""
+    # If-None-Match uses the weak comparison, so W/ prefixes don't matter
+    etags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(if_none_match or '')]
+    return '*' in etags or etag in etags
+
+
+def invalidate(user_ids, *kinds):
+    """
+    Move the given users' cached responses to a new generation. Inside a database
+    transaction the generation moves again after commit, so a read that built from
+    the old rows meanwhile is cached under a generation that is already stale.
+    """
+    keys = [generation_key(kind, user_id) for user_id in set(user_ids) for kind in kinds]
+    if not keys:
+        return
+    _bump(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(keys))
+
+
+def _bump(keys):
+    cache = _cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Nobody has read this generation yet (or it was evicted); a reader may seed it first
+            if not cache.add(key, _seed(), None):
+                cache.incr(key)
+
+
+@receiver(transactions_posted)
+def invalidate_posted_balances(sender, transactions, **kwargs):
+    invalidate([txn.user_id for txn in transactions], BALANCE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profile(sender, instance, **kwargs):
+    invalidate([instance.pk], PROFILE)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_account(sender, instance, **kwargs):
+    invalidate([instance.user_id], BALANCE)
+
+
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Card)
+def invalidate_cards(sender, instance, **kwargs):
+    invalidate([instance.user_id], CARDS)
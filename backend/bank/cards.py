@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import CARDS, invalidate
+from .models import Card, generate_card_number
+from .numbering import card_numbers
+
+CARD_VALIDITY = timedelta(days=365)
+
+
+def expire_cards(today=None, chunk_size=5000, reissue=True):
+    """
+    Expire active cards whose expiry date has passed and, optionally, issue each
+    owner a replacement.
+
+    Works in chunks: every chunk reads its ids from the (card_Status, expiry_Date)
+    index, then locks the ones still active, expires them with one UPDATE and bulk
+    inserts their replacements in its own short transaction, so no lock is held
+    across the whole run and overlapping runs reissue each card once. Yields
+    ``(expired, reissued)`` per chunk.
+    """
+    today = today or timezone.localdate()
+    due = Card.objects.filter(card_Status='active', expiry_Date__lt=today).order_by('expiry_Date', 'pk')
+    while True:
+        batch = list(due.values_list('pk', 'user_id')[:chunk_size])
+        if not batch:
+            return
+        with transaction.atomic():
+            # Re-checking the status under the row locks skips cards deactivated,
+            # or expired by an overlapping run, since they were read
+            current = list(
+                Card.objects.select_for_update()
+                .filter(pk__in=[pk for pk, _ in batch], card_Status='active')
+                .values_list('pk', 'user_id')
+            )
+            expired = Card.objects.filter(
+                pk__in=[pk for pk, _ in current], card_Status='active'
+            ).update(card_Status='expired')
+            owners = [user_id for _, user_id in current]
+            reissued = 0
+            if reissue and owners:
+                serials = card_numbers.allocate_range(len(owners))
+                Card.objects.bulk_create([
+                    Card(user_id=user_id, card_number=generate_card_number(serial), expiry_Date=today + CARD_VALIDITY)
+                    for user_id, serial in zip(owners, serials)
+                ])
+                reissued = len(owners)
+            # update() and bulk_create() skip the signals that drop cached card lists
+            invalidate(owners, CARDS)
+        yield expired, reissued
+        if len(batch) < chunk_size:
+            return
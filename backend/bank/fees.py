@@ -0,0 +1,130 @@
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FeeSchedule, FeeTier, User
+
+# Fee schedules live in FeeSchedule/FeeTier rows but are compiled into a FeeTable
+# held by each process, so quoting a fee is a bisect over sorted tier bounds with
+# no queries. At most every FEE_SCHEDULE_CHECK_SECONDS a process reads the
+# schedules' version from the database (row counts and latest updated_at of
+# schedules and tiers) and recompiles when it has moved, so an edit reaches every
+# worker without a shared cache. Transaction types without a schedule pay
+# DEFAULT_FEE_RATE.
+
+DEFAULT_FEE_RATE = Decimal('0.02')  # 2% fee on withdrawals and transfers
+CENTS = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+class CompiledSchedule:
+    __slots__ = ('bounds', 'tiers')
+
+    def __init__(self, tiers):
+        tiers = sorted(tiers, key=lambda tier: tier.min_amount)
+        self.bounds = [tier.min_amount for tier in tiers]
+        self.tiers = [(tier.rate, tier.flat_fee, tier.max_fee) for tier in tiers]
+
+    def quote(self, amount):
+        """Fee for ``amount``; amounts below the lowest tier are free."""
+        index = bisect_right(self.bounds, amount) - 1
+        if index < 0:
+            return ZERO
+        rate, flat_fee, max_fee = self.tiers[index]
+        fee = (flat_fee + amount * rate).quantize(CENTS)
+        return min(fee, max_fee) if max_fee is not None else fee
+
+
+class FeeTable:
+    def __init__(self, schedules=(), version=None):
+        # (transaction_type, segment) -> CompiledSchedule; '' is every other segment
+        self.schedules = {
+            (schedule.transaction_type, schedule.segment): CompiledSchedule(schedule.tiers.all())
+            for schedule in schedules
+        }
+        self.segmented = {transaction_type for transaction_type, segment in self.schedules if segment}
+        self.version = version
+
+    def quote(self, amount, transaction_type, segment=''):
+        amount = Decimal(amount)
+        schedule = self.schedules.get((transaction_type, segment)) or self.schedules.get((transaction_type, ''))
+        if schedule is None:
+            return (amount * DEFAULT_FEE_RATE).quantize(CENTS)
+        return schedule.quote(amount)
+
+
+_table = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _version():
+    """Changes whenever a schedule or tier is saved, added or deleted."""
+    version = ()
+    for model in (FeeSchedule, FeeTier):
+        stats = model.objects.aggregate(count=Count('pk'), updated_at=Max('updated_at'))
+        version += (stats['count'], stats['updated_at'])
+    return version
+
+
+def compile_table(version=None):
+    schedules = FeeSchedule.objects.filter(is_active=True).prefetch_related('tiers')
+    return FeeTable(schedules, version)
+
+
+def fee_table():
+    """This process's compiled fee table, recompiled once the database version moves on."""
+    global _table, _checked_at
+    now = time.monotonic()
+    table = _table
+    if table is not None and now - _checked_at < settings.FEE_SCHEDULE_CHECK_SECONDS:
+        return table
+    version = _version()
+    if table is None or table.version != version:
+        table = compile_table(version)
+    with _lock:
+        _table = table
+        _checked_at = now
+    return table
+
+
+def invalidate():
+    """Drop this process's table now and once the change commits; others notice the new version."""
+
+    def drop():
+        global _table
+        with _lock:
+            _table = None
+
+    drop()
+    transaction.on_commit(drop)
+
+
+@receiver([post_save, post_delete], sender=FeeSchedule)
+@receiver([post_save, post_delete], sender=FeeTier)
+def schedule_changed(sender, **kwargs):
+    invalidate()
+
+
+def fee_segment(user_id, transaction_type):
+    """The user's segment, only looked up when some schedule for the type is segment specific."""
+    if transaction_type not in fee_table().segmented:
+        return ''
+    return User.objects.filter(pk=user_id).values_list('segment', flat=True).first() or ''
+
+
+def calculate_fee(amount, transaction_type='transfer', segment=''):
+    return fee_table().quote(amount, transaction_type, segment)
+
+
+def preview_fees(amounts, transaction_type, segment=''):
+    """Quote many amounts against one compiled table."""
+    table = fee_table()
+    return [(amount, table.quote(amount, transaction_type, segment)) for amount in amounts]
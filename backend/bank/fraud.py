@@ -0,0 +1,303 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import FraudProfile
+from .signals import transactions_posted
+
+try:
+    import numpy as np
+except ImportError:  # optional: only batch_features() needs it
+    np = None
+
+# Fraud scoring of outgoing transfers from rolling per-user features.
+#
+# Each sender's recent activity is kept in a FeatureState: 10-minute buckets of
+# transfer count and amount covering 24 hours, running mean/variance of amounts
+# and the most recent recipients. States live in an in-process LRU, are loaded
+# from FraudProfile on a miss and written back at most every
+# FRAUD_PROFILE_FLUSH_SECONDS as transfers come in.
+# Workers don't share their in-memory state, so features are approximate across
+# processes; entries are reloaded after FRAUD_PROFILE_TTL to bound the drift.
+#
+# Scorers are callables taking the feature dict and returning points. Written
+# with arithmetic and comparisons only, the same scorer works on one transfer's
+# numbers and on NumPy arrays in the offline rescore_transfers command, whose
+# features come from batch_features(): the same buckets and recipient window
+# as FeatureState, computed for a whole history at once.
+#
+# FRAUD_SCORING_MODE 'log' only logs the transfers that would be declined;
+# 'block' declines them.
+
+logger = logging.getLogger('bank.fraud')
+
+BUCKET_SECONDS = 600
+BUCKETS_PER_DAY = 86400 // BUCKET_SECONDS
+BUCKETS_PER_HOUR = 3600 // BUCKET_SECONDS
+MAX_RECIPIENTS = 200
+
+
+def velocity_score(features):
+    """Bursts of transfers."""
+    return (features['count_1h'] >= 10) * 50 + (features['count_24h'] >= 50) * 30
+
+
+def amount_spike_score(features):
+    """An amount far above the sender's usual, once there is a history to compare with."""
+    return (features['history_count'] >= 5) * (features['zscore'] >= 4) * 60
+
+
+def new_recipient_score(features):
+    """An unusually large amount to an account the sender hasn't paid recently."""
+    return features['new_recipient'] * (features['zscore'] >= 2) * 40
+
+
+class FeatureState:
+    __slots__ = ('buckets', 'count', 'mean', 'm2', 'recipients')
+
+    def __init__(self, data=None):
+        data = data or {}
+        # bucket number -> [count, amount]
+        self.buckets = {int(slot): values for slot, values in data.get('buckets', {}).items()}
+        self.count = data.get('count', 0)
+        self.mean = data.get('mean', 0.0)
+        self.m2 = data.get('m2', 0.0)
+        self.recipients = OrderedDict.fromkeys(data.get('recipients', []))
+
+    def to_json(self):
+        return {
+            'buckets': {str(slot): values for slot, values in self.buckets.items()},
+            'count': self.count, 'mean': self.mean, 'm2': self.m2,
+            'recipients': list(self.recipients),
+        }
+
+    def features(self, amount, recipient_id, now):
+        """The feature dict for a prospective transfer, not yet counted."""
+        current = int(now // BUCKET_SECONDS)
+        count_1h = amount_1h = count_24h = amount_24h = 0
+        for slot, (count, total) in self.buckets.items():
+            age = current - slot
+            if age < BUCKETS_PER_DAY:
+                count_24h += count
+                amount_24h += total
+                if age < BUCKETS_PER_HOUR:
+                    count_1h += count
+                    amount_1h += total
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        amount = float(amount)
+        return {
+            'amount': amount,
+            'count_1h': count_1h,
+            'amount_1h': amount_1h,
+            'count_24h': count_24h,
+            'amount_24h': amount_24h,
+            'new_recipient': recipient_id not in self.recipients,
+            'zscore': (amount - self.mean) / std if std else 0.0,
+            'history_count': self.count,
+        }
+
+    def record(self, amount, recipient_id, when):
+        amount = float(amount)
+        slot = int(when // BUCKET_SECONDS)
+        bucket = self.buckets.setdefault(slot, [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += amount
+        oldest = int(time.time() // BUCKET_SECONDS) - BUCKETS_PER_DAY
+        for stale in [slot for slot in self.buckets if slot <= oldest]:
+            del self.buckets[stale]
+        # Welford's running mean and variance
+        self.count += 1
+        delta = amount - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount - self.mean)
+        self.recipients.pop(recipient_id, None)
+        self.recipients[recipient_id] = None
+        while len(self.recipients) > MAX_RECIPIENTS:
+            self.recipients.popitem(last=False)
+
+
+def batch_features(users, recipients, amounts, times):
+    """
+    FeatureState.features() for every row of a transfer history, each from the
+    transfers before it. Takes NumPy arrays sorted by user, then time.
+    """
+    size = len(users)
+    index = np.arange(size)
+    new_group = np.r_[True, users[1:] != users[:-1]]
+    group = np.cumsum(new_group) - 1
+    group_start = np.flatnonzero(new_group)[group]
+    history_count = index - group_start
+
+    # One sorted key over (user, bucket), so a window of buckets is a searchsorted range
+    slots = (times // BUCKET_SECONDS).astype(np.int64)
+    key = group.astype(np.int64) * (int(slots.max() - slots.min()) + BUCKETS_PER_DAY + 1) + (slots - slots.min())
+    amount_sums = np.r_[0.0, np.cumsum(amounts)]
+
+    def window(buckets):
+        first = np.searchsorted(key, key - (buckets - 1), side='left')
+        return index - first, amount_sums[index] - amount_sums[first]
+
+    count_1h, amount_1h = window(BUCKETS_PER_HOUR)
+    count_24h, amount_24h = window(BUCKETS_PER_DAY)
+
+    # Mean and standard deviation of the user's earlier amounts
+    squares = np.r_[0.0, np.cumsum(amounts ** 2)]
+    prior_sum = amount_sums[index] - amount_sums[group_start]
+    prior_squares = squares[index] - squares[group_start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = prior_sum / history_count
+        variance = (prior_squares - history_count * mean ** 2) / (history_count - 1)
+        std = np.sqrt(np.clip(variance, 0, None))
+        zscore = np.where((history_count > 1) & (std > 0), (amounts - mean) / std, 0.0)
+
+    # A recipient is new unless it is among the user's MAX_RECIPIENTS most recent
+    # ones: paid before, with fewer other recipients paid since
+    pairs = group.astype(np.int64) * (int(recipients.max()) + 1) + recipients
+    order = np.lexsort((index, pairs))
+    repeat = np.r_[False, pairs[order][1:] == pairs[order][:-1]]
+    previous = np.full(size, -1)
+    previous[order[repeat]] = order[np.flatnonzero(repeat) - 1]
+    new_recipient = previous < 0
+    # Under MAX_RECIPIENTS rows in between can't hold that many recipients
+    for row in np.flatnonzero((previous >= 0) & (index - previous > MAX_RECIPIENTS)):
+        since = np.unique(pairs[previous[row] + 1:row]).size
+        new_recipient[row] = since >= MAX_RECIPIENTS
+
+    return {
+        'amount': amounts,
+        'count_1h': count_1h,
+        'amount_1h': amount_1h,
+        'count_24h': count_24h,
+        'amount_24h': amount_24h,
+        'new_recipient': new_recipient,
+        'zscore': zscore,
+        'history_count': history_count,
+    }
+
+
+class _Entry:
+    __slots__ = ('state', 'loaded_at', 'flushed_at', 'dirty')
+
+    def __init__(self, state, now):
+        self.state = state
+        self.loaded_at = now
+        self.flushed_at = now
+        self.dirty = False
+
+
+def _save_state(user_id, state):
+    if not FraudProfile.objects.filter(user_id=user_id).update(state=state):
+        FraudProfile.objects.get_or_create(user_id=user_id, defaults={'state': state})
+
+
+class ProfileStore:
+    """
+    In-process LRU of FeatureStates backed by FraudProfile rows. The lock only
+    guards memory; profile rows are read and written outside it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _fresh(self, user_id, now):
+        entry = self._entries.get(user_id)
+        if entry is not None and now - entry.loaded_at <= settings.FRAUD_PROFILE_TTL:
+            self._entries.move_to_end(user_id)
+            return entry
+        return None
+
+    def _entry(self, user_id, now):
+        with self._lock:
+            entry = self._fresh(user_id, now)
+            if entry is not None:
+                return entry
+            expired = self._entries.pop(user_id, None)
+            pending = expired.state.to_json() if expired is not None and expired.dirty else None
+        if pending is not None:
+            _save_state(user_id, pending)
+        data = FraudProfile.objects.filter(user_id=user_id).values_list('state', flat=True).first()
+
+        evicted = []
+        with self._lock:
+            entry = self._fresh(user_id, now)
+            if entry is None:
+                entry = self._entries[user_id] = _Entry(FeatureState(data), now)
+            while len(self._entries) > settings.FRAUD_PROFILE_CACHE_SIZE:
+                evicted_id, old = self._entries.popitem(last=False)
+                if old.dirty:
+                    evicted.append((evicted_id, old.state.to_json()))
+        for evicted_id, state in evicted:
+            _save_state(evicted_id, state)
+        return entry
+
+    def features(self, user_id, amount, recipient_id):
+        now = time.time()
+        entry = self._entry(user_id, now)
+        with self._lock:
+            return entry.state.features(amount, recipient_id, now)
+
+    def record(self, transfers):
+        """Count committed ``(user_id, amount, recipient_id, timestamp)`` transfers."""
+        now = time.time()
+        flush = {}
+        for user_id, amount, recipient_id, when in transfers:
+            entry = self._entry(user_id, now)
+            with self._lock:
+                entry.state.record(amount, recipient_id, when)
+                entry.dirty = True
+                if now - entry.flushed_at >= settings.FRAUD_PROFILE_FLUSH_SECONDS:
+                    entry.flushed_at = now
+                    entry.dirty = False
+                    flush[user_id] = entry.state.to_json()
+        for user_id, state in flush.items():
+            _save_state(user_id, state)
+
+
+profiles = ProfileStore()
+_scorers = None
+
+
+def get_scorers():
+    global _scorers
+    if _scorers is None:
+        _scorers = [import_string(path) for path in settings.FRAUD_SCORERS]
+    return _scorers
+
+
+def score(features):
+    return sum(scorer(features) for scorer in get_scorers())
+
+
+def check_transfer(user_id, amount, recipient_id):
+    """Decline (or in 'log' mode, log) the transfer if its score reaches FRAUD_BLOCK_SCORE."""
+    if not settings.FRAUD_SCORING_ENABLED:
+        return
+    points = score(profiles.features(user_id, amount, recipient_id))
+    if points < settings.FRAUD_BLOCK_SCORE:
+        return
+    if settings.FRAUD_SCORING_MODE != 'block':
+        logger.warning("Transfer of %s from user %s to account %s scored %s", amount, user_id, recipient_id, points)
+        return
+    raise ValidationError("Transfer declined by risk checks.")
+
+
+@receiver(transactions_posted)
+def record_transfer_features(sender, transactions, **kwargs):
+    if not settings.FRAUD_SCORING_ENABLED:
+        return
+    transfers = [
+        (txn.user_id, txn.amount, txn.to_account_id, txn.date.timestamp())
+        for txn in transactions if txn.transaction_type == 'transfer'
+    ]
+    if transfers:
+        # Rolled back transfers never reach the features
+        transaction.on_commit(lambda: profiles.record(transfers))
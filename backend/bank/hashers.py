@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+def _param(name, default):
+    return settings.PASSWORD_HASHER_PARAMS.get(name, default)
+
+
+# The tuned hashers keep their parents' algorithm names, so existing hashes still
+# verify and are rehashed on the next login whenever the cost settings change.
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = _param('pbkdf2_iterations', PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = _param('scrypt_work_factor', ScryptPasswordHasher.work_factor)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    # Needs the optional argon2-cffi package
+    time_cost = _param('argon2_time_cost', Argon2PasswordHasher.time_cost)
+    memory_cost = _param('argon2_memory_cost', Argon2PasswordHasher.memory_cost)
+    parallelism = _param('argon2_parallelism', Argon2PasswordHasher.parallelism)
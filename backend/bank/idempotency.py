@@ -0,0 +1,63 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha256(f"{request.path}\n{body}".encode()).hexdigest()
+
+
+def replay(stored, request_hash):
+    if stored.request_hash != request_hash:
+        return Response(
+            {"message": f"{HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response_body, status=stored.response_status, headers={'Idempotent-Replayed': 'true'})
+
+
+def run_idempotent(request, handler):
+    """
+    Run ``handler()`` at most once per user and Idempotency-Key.
+
+    A retry is answered from the stored response with one indexed lookup. The
+    handler's writes and the stored response commit together, so two racing
+    retries can't both apply: the loser's work is rolled back and it replays
+    the winner's response. Only successful responses are stored; failed
+    requests changed nothing and may simply run again.
+    """
+    key = request.headers.get(HEADER)
+    if not key:
+        return handler()
+    if len(key) > 255:
+        raise ValidationError(f"{HEADER} must be at most 255 characters.")
+
+    request_hash = request_fingerprint(request)
+    stored = IdempotencyKey.objects.filter(user_id=request.user.pk, key=key).first()
+    if stored is not None:
+        return replay(stored, request_hash)
+
+    try:
+        with transaction.atomic():
+            response = handler()
+            if status.is_success(response.status_code):
+                IdempotencyKey.objects.create(
+                    user_id=request.user.pk, key=key, request_hash=request_hash,
+                    response_status=response.status_code, response_body=response.data,
+                )
+    except IntegrityError:
+        stored = IdempotencyKey.objects.filter(user_id=request.user.pk, key=key).first()
+        if stored is None:
+            raise
+        return replay(stored, request_hash)
+    return response
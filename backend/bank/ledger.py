@@ -0,0 +1,83 @@
+from decimal import Decimal
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.dispatch import receiver
+
+from .models import Account, JournalEntry, Posting
+from .signals import transactions_posted
+
+ZERO = Decimal('0.00')
+CENTS = Decimal('0.01')
+# Amounts closer than half a cent are equal; SQLite sums decimals as floats
+HALF_CENT = Decimal('0.005')
+
+
+def journal_postings(txn):
+    """
+    The (account_id, system_account, amount) postings for one transaction.
+
+    Amounts are changes to each ledger account's balance: customer accounts and fee
+    income go up with credits, and cash goes down by what customers deposit.
+    'received' rows return nothing: they are the second leg of a transfer's entry.
+    """
+    if txn.transaction_type == 'deposit':
+        return [(txn.account_id, '', txn.amount), (None, 'cash', -txn.amount)]
+    if txn.transaction_type == 'withdrawal':
+        postings = [(txn.account_id, '', -(txn.amount + txn.fee)), (None, 'cash', txn.amount)]
+    elif txn.transaction_type == 'transfer':
+        postings = [(txn.account_id, '', -(txn.amount + txn.fee)), (txn.to_account_id, '', txn.amount)]
+    else:
+        return []
+    if txn.fee:
+        postings.append((None, 'fee_income', txn.fee))
+    return postings
+
+
+@receiver(transactions_posted)
+def record_journal_entries(sender, transactions, **kwargs):
+    """Append one journal entry with its postings per posted transaction; inserts only."""
+    entries = []
+    postings = []
+    for txn in transactions:
+        lines = journal_postings(txn)
+        if not lines:
+            continue
+        entry = JournalEntry(transaction_id=txn.pk, kind=txn.transaction_type, created_at=txn.date)
+        entries.append(entry)
+        postings.extend(
+            Posting(entry=entry, account_id=account_id, system_account=system_account, amount=amount)
+            for account_id, system_account, amount in lines
+        )
+    JournalEntry.objects.bulk_create(entries, batch_size=1000)
+    Posting.objects.bulk_create(postings, batch_size=1000)
+
+
+def system_balance(system_account):
+    """Balance of an internal ledger account such as 'fee_income', derived from its postings."""
+    return Posting.objects.filter(system_account=system_account).aggregate(
+        total=Coalesce(Sum('amount'), ZERO)
+    )['total']
+
+
+def reconcile():
+    """
+    Check the journal in two aggregate queries: all postings must sum to zero,
+    and each account's postings must add up to its visible balance.
+    """
+    totals = Posting.objects.aggregate(
+        total=Coalesce(Sum('amount'), ZERO),
+        fee_income=Coalesce(Sum('amount', filter=Q(system_account='fee_income')), ZERO),
+        cash=Coalesce(Sum('amount', filter=Q(system_account='cash')), ZERO),
+    )
+    totals = {name: value.quantize(CENTS) for name, value in totals.items()}
+    mismatched = [
+        (account_number, balance.quantize(CENTS), ledger_balance.quantize(CENTS))
+        for account_number, balance, ledger_balance in Account.objects.with_visible_balance()
+        .annotate(
+            ledger_balance=Coalesce(Sum('postings__amount'), ZERO),
+            difference=F('visible_balance') - F('ledger_balance'),
+        )
+        .exclude(difference__gt=-HALF_CENT, difference__lt=HALF_CENT)
+        .values_list('accountNumber', 'visible_balance', 'ledger_balance')
+    ]
+    return totals, mismatched
@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bank.archive import archive_before
+from bank.models import Transaction
+
+
+class Command(BaseCommand):
+    help = "Move transactions older than the archive horizon out of the hot table; safe to run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TRANSACTION_ARCHIVE_AFTER_DAYS,
+                            help="Archive transactions older than this many days.")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            count = Transaction.objects.filter(date__lt=cutoff).count()
+            self.stdout.write(f"{count} transactions are dated before {cutoff:%Y-%m-%d %H:%M}.")
+            return
+
+        started = time.perf_counter()
+        moved = 0
+        for count in archive_before(cutoff, options['chunk_size']):
+            moved += count
+            self.stdout.write(f"{moved} archived")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} transactions dated before {cutoff:%Y-%m-%d %H:%M} "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bank.models import Account
+from bank.snapshots import rebuild_daily_balances
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily balance snapshots from existing transaction history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', action='append', dest='accounts', metavar='ACCOUNT_NUMBER',
+                            help="Only rebuild this account (repeatable).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Accounts rebuilt per transaction.")
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.order_by('pk')
+        if options['accounts']:
+            accounts = accounts.filter(accountNumber__in=options['accounts'])
+        account_ids = list(accounts.values_list('pk', flat=True))
+
+        written = 0
+        size = options['chunk_size']
+        for start in range(0, len(account_ids), size):
+            with transaction.atomic():
+                written += rebuild_daily_balances(account_ids[start:start + size])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} daily snapshots for {len(account_ids)} accounts."
+        ))
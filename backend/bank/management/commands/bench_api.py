@@ -0,0 +1,206 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import override_settings
+
+from bank.api.views import get_tokens_for_user
+from bank.benchmarks import conservation_problems, percentiles, run_micro_benchmarks, seed_history, seed_users
+from bank.ledger import reconcile
+from bank.models import User
+
+SCENARIOS = ['signup', 'login', 'transfer', 'balance', 'history']
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class QueryCountingApp:
+    """WSGI wrapper recording how many SQL queries each request path ran."""
+
+    def __init__(self, app):
+        self.app = app
+        self.counts = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        executed = [0]
+
+        def count(execute, sql, params, many, context):
+            executed[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = self.app(environ, start_response)
+        with self._lock:
+            self.counts[environ['PATH_INFO']].append(executed[0])
+        return response
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users with bulk fixtures, drive the signup, login, transfer, balance and history "
+        "endpoints concurrently over HTTP, and report throughput, latency percentiles, queries "
+        "per request and whether balances + fees were conserved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--history', type=int, default=20, help="Seeded transfers per user.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                            help="Scenario to run; repeat for several. Defaults to all.")
+        parser.add_argument('--url', help="Base URL of a running server. By default one is started in process.")
+        parser.add_argument('--opening-balance', type=Decimal, default=Decimal('100000.00'))
+        parser.add_argument('--throttle', action='store_true',
+                            help="Keep request throttling on; by default it is off so it doesn't skew results.")
+        parser.add_argument('--micro', action='store_true', help="Also run the in-process micro-benchmarks.")
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark users afterwards.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError("At least two users are needed to transfer between.")
+
+        self.password = uuid.uuid4().hex
+        started = time.perf_counter()
+        self.accounts = seed_users(options['users'], self.password, options['opening_balance'])
+        seed_history(self.accounts, options['history'])
+        self.stdout.write(
+            f"seeded {len(self.accounts)} users and {len(self.accounts) * options['history']} transfers "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        self.tokens = {
+            account.user_id: get_tokens_for_user(account.user)['access'] for account in self.accounts
+        }
+        self.signups = []
+
+        server = counter = None
+        base_url = options['url']
+        if not base_url:
+            counter = QueryCountingApp(get_wsgi_application())
+            server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler)
+            server.set_app(counter)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f"http://127.0.0.1:{server.server_port}"
+        self.base_url = base_url.rstrip('/')
+
+        try:
+            with override_settings(BANK_THROTTLE_ENABLED=options['throttle']):
+                for scenario in options['scenario'] or SCENARIOS:
+                    self.run_scenario(scenario, options['requests'], options['concurrency'], counter)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        problems = conservation_problems([account.pk for account in self.accounts])
+        totals, mismatched = reconcile()
+        if totals['total'] or mismatched:
+            problems.append(f"journal out of balance ({len(mismatched)} accounts differ)")
+
+        if options['micro']:
+            for name, seconds in run_micro_benchmarks():
+                self.stdout.write(f"micro {name}: {seconds * 1e6:.2f}us per call")
+
+        if not options['keep']:
+            user_ids = [account.user_id for account in self.accounts] + self.signups
+            User.objects.filter(pk__in=user_ids).delete()
+
+        if problems:
+            raise CommandError("Invariant violated: " + "; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Invariants hold: balances + fees are conserved."))
+
+    def run_scenario(self, scenario, requests, concurrency, counter):
+        path, build = getattr(self, f'scenario_{scenario}')()
+        latencies = []
+        outcomes = defaultdict(int)
+        lock = threading.Lock()
+
+        def fire(_):
+            method, body, token = build()
+            request = Request(f"{self.base_url}{path}", method=method, data=body)
+            request.add_header('Content-Type', 'application/json')
+            if token:
+                request.add_header('Authorization', f"Bearer {token}")
+            started = time.perf_counter()
+            try:
+                with urlopen(request) as response:
+                    status = response.status
+                    payload = response.read()
+            except HTTPError as exc:
+                status = exc.code
+                payload = exc.read()
+            elapsed = time.perf_counter() - started
+            if scenario == 'signup' and status == 201:
+                with lock:
+                    self.signups.append(json.loads(payload)['user']['id'])
+            with lock:
+                latencies.append(elapsed)
+                # A refused transfer (e.g. insufficient funds) is a valid answer, not an error
+                outcomes['ok' if status < 400 else 'rejected' if status < 500 else 'error'] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(fire, range(requests)))
+        elapsed = time.perf_counter() - started
+
+        points = percentiles(latencies)
+        queries = 'n/a'
+        if counter is not None and counter.counts[path]:
+            samples = counter.counts[path]
+            queries = f"{sum(samples) / len(samples):.1f}"
+        self.stdout.write(
+            f"{scenario}: {requests / elapsed:.1f} req/s, "
+            f"p50={points[50] * 1000:.1f}ms p95={points[95] * 1000:.1f}ms p99={points[99] * 1000:.1f}ms, "
+            f"{queries} queries/request, "
+            f"{outcomes['ok']} ok / {outcomes['rejected']} rejected / {outcomes['error']} errors"
+        )
+
+    def random_account(self):
+        return random.choice(self.accounts)
+
+    def scenario_signup(self):
+        def build():
+            phone = f"4{random.randint(0, 10**9 - 1):09d}"
+            body = {
+                'phoneNumber': phone, 'password': self.password, 'first_name': 'Bench', 'last_name': 'Signup',
+                'email': f"{phone}@example.com", 'address': 'Benchmark',
+            }
+            return 'POST', json.dumps(body).encode(), None
+        return '/api/signup/', build
+
+    def scenario_login(self):
+        def build():
+            body = {'username': self.random_account().user.phoneNumber, 'password': self.password}
+            return 'POST', json.dumps(body).encode(), None
+        return '/api/login/', build
+
+    def scenario_transfer(self):
+        def build():
+            sender, recipient = random.sample(self.accounts, 2)
+            body = {
+                'from_account': sender.accountNumber, 'to_account': recipient.accountNumber,
+                'amount': str(Decimal(random.randint(500, 5000)) / 100),
+            }
+            return 'POST', json.dumps(body).encode(), self.tokens[sender.user_id]
+        return '/api/transactions/', build
+
+    def scenario_balance(self):
+        return '/api/balance/', lambda: ('GET', None, self.tokens[self.random_account().user_id])
+
+    def scenario_history(self):
+        return '/api/gettransactions/', lambda: ('GET', None, self.tokens[self.random_account().user_id])
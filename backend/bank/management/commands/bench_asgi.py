@@ -0,0 +1,79 @@
+import asyncio
+import random
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+
+from bank.authentication import BankRefreshToken
+from bank.models import Account, Transaction, User
+
+ENDPOINTS = ['balance', 'getmyprofile', 'mycards', 'gettransactions']
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and memory per concurrent request of the async read "
+        "endpoints (/api/async/...) against their WSGI counterparts, in process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--endpoint', choices=ENDPOINTS, default='gettransactions')
+
+    def handle(self, *args, **options):
+        phone = f"6{random.randint(0, 10**9 - 1):09d}"
+        user = User.objects.create_user(username=phone, phoneNumber=phone, password=None)
+        try:
+            account = Account.objects.get(user=user)
+            for _ in range(20):
+                Transaction(account=account, amount=Decimal('10.00'), transaction_type='deposit').save()
+            authorization = f"Bearer {BankRefreshToken.for_user(user).access_token}"
+
+            for label, path, runner in [
+                ('wsgi', f"/api/{options['endpoint']}/", self.run_sync),
+                ('asgi', f"/api/async/{options['endpoint']}/", self.run_async),
+            ]:
+                tracemalloc.start()
+                started = time.perf_counter()
+                failures = runner(path, authorization, options['requests'], options['concurrency'])
+                elapsed = time.perf_counter() - started
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"{label}: {options['requests'] / elapsed:.1f} req/s, "
+                    f"{peak / options['concurrency'] / 1024:.1f} KiB peak per concurrent request, "
+                    f"{failures} failures"
+                )
+        finally:
+            user.delete()
+
+    def run_sync(self, path, authorization, requests, concurrency):
+        def fetch(_):
+            try:
+                return Client().get(path, HTTP_AUTHORIZATION=authorization).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return sum(1 for code in pool.map(fetch, range(requests)) if code != 200)
+
+    def run_async(self, path, authorization, requests, concurrency):
+        async def main():
+            client = AsyncClient()
+            limit = asyncio.Semaphore(concurrency)
+
+            async def fetch():
+                async with limit:
+                    response = await client.get(path, headers={'Authorization': authorization})
+                    return response.status_code
+
+            codes = await asyncio.gather(*(fetch() for _ in range(requests)))
+            return sum(1 for code in codes if code != 200)
+
+        return asyncio.run(main())
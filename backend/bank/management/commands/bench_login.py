@@ -0,0 +1,69 @@
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import identify_hasher
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from bank.models import User
+
+
+class Command(BaseCommand):
+    help = "Measure single-core login throughput for the configured password hasher profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20)
+        parser.add_argument('--compare', action='store_true',
+                            help="Also time every hasher profile's verify step on its own.")
+
+    def handle(self, *args, **options):
+        password = uuid.uuid4().hex
+        phone = f"8{random.randint(0, 10**9 - 1):09d}"
+        user = User.objects.create_user(username=phone, phoneNumber=phone, password=password)
+        try:
+            hasher = identify_hasher(user.password)
+            started = time.perf_counter()
+            for _ in range(options['logins']):
+                if authenticate(username=phone, password=password) is None:
+                    raise RuntimeError("Benchmark login failed.")
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"profile={settings.PASSWORD_HASHER_PROFILE} ({hasher.algorithm}, {self._cost(hasher)}): "
+                f"{options['logins'] / elapsed:.1f} logins/sec per core, "
+                f"{elapsed / options['logins'] * 1000:.1f}ms per login"
+            )
+        finally:
+            user.delete()
+
+        if options['compare']:
+            for profile, path in settings.PASSWORD_HASHER_PROFILES.items():
+                self._time_verify(profile, path, options['logins'])
+
+    def _time_verify(self, profile, path, rounds):
+        try:
+            hasher = import_string(path)()
+            encoded = hasher.encode('benchmark-password', hasher.salt())
+        except ValueError as exc:
+            # e.g. argon2-cffi is not installed
+            self.stdout.write(f"profile={profile}: skipped ({exc})")
+            return
+        started = time.perf_counter()
+        for _ in range(rounds):
+            hasher.verify('benchmark-password', encoded)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"profile={profile} ({hasher.algorithm}, {self._cost(hasher)}): "
+            f"{rounds / elapsed:.1f} verifies/sec per core"
+        )
+
+    def _cost(self, hasher):
+        if hasattr(hasher, 'iterations'):
+            return f"iterations={hasher.iterations}"
+        if hasattr(hasher, 'work_factor'):
+            return f"N={hasher.work_factor} r={hasher.block_size} p={hasher.parallelism}"
+        if hasattr(hasher, 'time_cost'):
+            return f"t={hasher.time_cost} m={hasher.memory_cost} p={hasher.parallelism}"
+        return "default cost"
@@ -0,0 +1,118 @@
+import random
+import statistics
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from django.db.models import Sum
+
+from bank.benchmarks import to_cents
+from bank.models import Account, Transaction, User
+
+
+class Command(BaseCommand):
+    help = "Stress the transfer engine with parallel workers and verify that no update is lost."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--transfers', type=int, default=200, help="Transfers per worker.")
+        parser.add_argument('--accounts', type=int, default=10)
+        parser.add_argument('--opening-balance', type=Decimal, default=Decimal('10000.00'))
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark users afterwards.")
+
+    def handle(self, *args, **options):
+        if options['accounts'] < 2:
+            raise CommandError("At least two accounts are needed to transfer between.")
+
+        run_id = uuid.uuid4().hex[:6]
+        users = [
+            User.objects.create_user(
+                username=f"bench-{run_id}-{i}",
+                phoneNumber=f"9{random.randint(0, 10**9 - 1):09d}",
+                password=None,
+            )
+            for i in range(options['accounts'])
+        ]
+        accounts = list(Account.objects.filter(user__in=users))
+        for account in accounts:
+            Transaction(account=account, amount=options['opening_balance'], transaction_type='deposit').save()
+        account_ids = [account.pk for account in accounts]
+        expected_total = options['opening_balance'] * len(accounts)
+
+        stats = {'ok': 0, 'rejected': 0, 'retries': 0}
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                for _ in range(options['transfers']):
+                    sender, recipient = random.sample(account_ids, 2)
+                    amount = Decimal(random.randint(500, 5000)) / 100
+                    while True:
+                        started = time.perf_counter()
+                        try:
+                            Transaction(
+                                account_id=sender, to_account_id=recipient,
+                                amount=amount, transaction_type='transfer',
+                            ).save()
+                            outcome = 'ok'
+                        except ValidationError:
+                            outcome = 'rejected'
+                        except OperationalError:
+                            # SQLite reports writer contention as "database is locked"
+                            with lock:
+                                stats['retries'] += 1
+                            time.sleep(0.001)
+                            continue
+                        break
+                    with lock:
+                        stats[outcome] += 1
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['workers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        balances = Account.objects.filter(pk__in=account_ids).aggregate(total=Sum('balance'))['total']
+        fees = Transaction.objects.filter(
+            account_id__in=account_ids, transaction_type='transfer'
+        ).aggregate(total=Sum('fee'))['total'] or Decimal('0.00')
+        transfers = Transaction.objects.filter(account_id__in=account_ids, transaction_type='transfer').count()
+        received = Transaction.objects.filter(account_id__in=account_ids, transaction_type='received').count()
+        negative = Account.objects.filter(pk__in=account_ids, balance__lt=0).count()
+
+        latencies.sort()
+        self.stdout.write(
+            f"{stats['ok']} transfers ({stats['rejected']} rejected, {stats['retries']} lock retries) "
+            f"with {options['workers']} workers in {elapsed:.2f}s: {stats['ok'] / elapsed:.1f} transfers/s"
+        )
+        if latencies:
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(f"latency p50={statistics.median(latencies) * 1000:.2f}ms p95={p95 * 1000:.2f}ms")
+
+        problems = []
+        balances, fees = to_cents(balances), to_cents(fees)
+        if balances + fees != to_cents(expected_total):
+            problems.append(f"balances {balances} + fees {fees} != {expected_total}")
+        if transfers != stats['ok'] or received != stats['ok']:
+            problems.append(f"{transfers} transfer and {received} received rows for {stats['ok']} transfers")
+        if negative:
+            problems.append(f"{negative} accounts went negative")
+
+        if not options['keep']:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        if problems:
+            raise CommandError("Lost updates detected: " + "; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("No lost updates: balances + fees are conserved."))
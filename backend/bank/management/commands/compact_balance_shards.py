@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bank.models import Account
+
+
+class Command(BaseCommand):
+    help = "Fold the balance shards of sharded accounts back into their account rows."
+
+    def handle(self, *args, **options):
+        compacted = 0
+        for account in Account.objects.filter(balance_shards__gt=0).iterator():
+            if account.compact_shards():
+                compacted += 1
+        self.stdout.write(self.style.SUCCESS(f"Compacted {compacted} sharded accounts."))
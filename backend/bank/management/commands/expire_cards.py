@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from bank.cards import expire_cards
+
+
+class Command(BaseCommand):
+    help = "Expire active cards past their expiry date and issue replacements; safe to run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--no-reissue', action='store_true', help="Only expire, without replacement cards.")
+        parser.add_argument('--date', type=parse_date, help="Treat this YYYY-MM-DD date as today.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total_expired = total_reissued = 0
+        for expired, reissued in expire_cards(options['date'], options['chunk_size'], not options['no_reissue']):
+            total_expired += expired
+            total_reissued += reissued
+            self.stdout.write(f"{total_expired} expired, {total_reissued} reissued")
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {total_expired} cards and reissued {total_reissued} in {time.perf_counter() - started:.2f}s."
+        ))
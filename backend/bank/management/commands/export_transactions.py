@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from bank.api.views import filter_history
+from bank.archive import merge_oldest_first
+from bank.exports import FORMATS, export_rows, render_lines
+from bank.models import ArchivedTransaction, Transaction
+
+
+class Command(BaseCommand):
+    help = "Stream transaction history to CSV or NDJSON with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help="File to write, or - for stdout.")
+        parser.add_argument('--user', help="Only this user's transactions (phone number).")
+        parser.add_argument('--account', help="Only this account's transactions (account number).")
+        parser.add_argument('--date-from')
+        parser.add_argument('--date-to')
+        parser.add_argument('--type', help="Only this transaction type.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # Archived and hot rows are merged into one oldest-first stream
+        hot = self.filtered(Transaction.objects.all(), options)
+        archived = self.filtered(ArchivedTransaction.objects.all(), options)
+        rows = merge_oldest_first(
+            export_rows(hot, chunk_size=options['chunk_size']),
+            export_rows(archived, chunk_size=options['chunk_size']),
+        )
+        output = sys.stdout if options['output'] == '-' else open(options['output'], 'w', newline='')
+        try:
+            for line in render_lines(rows, options['format']):
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    def filtered(self, queryset, options):
+        if options['user']:
+            queryset = queryset.filter(user__phoneNumber=options['user'])
+        if options['account']:
+            queryset = queryset.filter(account__accountNumber=options['account'])
+        try:
+            return filter_history(queryset, {
+                'date_from': options['date_from'],
+                'date_to': options['date_to'],
+                'type': options['type'],
+            })
+        except ValidationError as exc:
+            raise CommandError(exc.detail[0])
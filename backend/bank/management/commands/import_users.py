@@ -0,0 +1,48 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bank.onboarding import import_users, init_hash_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import customers from a CSV file (phoneNumber, first_name, last_name, password "
+        "and optionally email, address, dob, SSN, balance), creating an account and a card for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="Processes hashing passwords; 0 hashes in this process.")
+        parser.add_argument('--max-errors', type=int, default=50, help="Rejected rows to print.")
+
+    def handle(self, *args, **options):
+        created = rejected = 0
+        started = time.perf_counter()
+        pool = None
+        hash_map = map
+        if options['workers']:
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=init_hash_worker)
+            hash_map = lambda func, items: pool.map(func, items, chunksize=64)  # noqa: E731
+
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as fileobj:
+                for chunk_created, errors in import_users(fileobj, options['chunk_size'], hash_map):
+                    created += chunk_created
+                    for line, message in errors:
+                        if rejected < options['max_errors']:
+                            self.stderr.write(f"line {line}: {message}")
+                        rejected += 1
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{created} imported, {rejected} rejected ({created / elapsed:.0f} users/s)")
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} users; {rejected} rows rejected."))
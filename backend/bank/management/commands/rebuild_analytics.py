@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from bank.analytics import rebuild_monthly_rollups
+from bank.models import Account
+
+
+def rebuild_chunk(account_ids):
+    # Each worker thread has its own database connection; close it when done
+    try:
+        with transaction.atomic():
+            return rebuild_monthly_rollups(account_ids)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly analytics rollups from transaction history, in parallel chunks of accounts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', action='append', dest='accounts', metavar='ACCOUNT_NUMBER',
+                            help="Only rebuild this account (repeatable).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Accounts rebuilt per transaction.")
+        parser.add_argument('--workers', type=int, default=4, help="Chunks rebuilt at the same time.")
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.order_by('pk')
+        if options['accounts']:
+            accounts = accounts.filter(accountNumber__in=options['accounts'])
+        account_ids = list(accounts.values_list('pk', flat=True))
+
+        size = options['chunk_size']
+        chunks = [account_ids[start:start + size] for start in range(0, len(account_ids), size)]
+        written = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            for count in pool.map(rebuild_chunk, chunks):
+                written += count
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} monthly rollups for {len(account_ids)} accounts in {len(chunks)} chunks."
+        ))
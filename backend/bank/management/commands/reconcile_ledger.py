@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bank.ledger import reconcile
+
+
+class Command(BaseCommand):
+    help = "Verify that the journal balances and matches every account's balance."
+
+    def handle(self, *args, **options):
+        totals, mismatched = reconcile()
+        self.stdout.write(
+            f"postings total={totals['total']} fee income={totals['fee_income']} cash={totals['cash']}"
+        )
+        for account_number, balance, ledger_balance in mismatched:
+            self.stderr.write(f"{account_number}: balance {balance} != ledger {ledger_balance}")
+
+        if totals['total'] or mismatched:
+            raise CommandError(f"Ledger out of balance ({len(mismatched)} accounts differ).")
+        self.stdout.write(self.style.SUCCESS("Ledger reconciles."))
@@ -0,0 +1,43 @@
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from bank.outbox import claim, deliver
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver outbox events to the configured webhooks in leased batches. "
+        "Several workers can run in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--lease-seconds', type=int, default=settings.OUTBOX_LEASE_SECONDS)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when idle.")
+        parser.add_argument('--once', action='store_true', help="Exit once no event is due.")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        delivered = failed = 0
+        try:
+            while True:
+                events = claim(worker, options['batch_size'], options['lease_seconds'])
+                if not events:
+                    if options['once']:
+                        break
+                    close_old_connections()
+                    time.sleep(options['poll_interval'])
+                    continue
+                sent, errors = deliver(events)
+                delivered += sent
+                failed += errors
+                if errors:
+                    self.stderr.write(f"{errors} events failed; they will be retried with backoff")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} events; {failed} delivery failures."))
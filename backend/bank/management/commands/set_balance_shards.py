@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bank.models import Account, BalanceShard
+
+
+class Command(BaseCommand):
+    help = "Spread an account's incoming credits over N balance shards (0 turns sharding off)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('account_number')
+        parser.add_argument('shards', type=int)
+
+    def handle(self, *args, **options):
+        shards = options['shards']
+        if not 0 <= shards <= 256:
+            raise CommandError("The number of shards must be between 0 and 256.")
+
+        with transaction.atomic():
+            try:
+                account = Account.objects.select_for_update().get(accountNumber=options['account_number'])
+            except Account.DoesNotExist:
+                raise CommandError("Account not found.")
+
+            # Stop crediting the shards first, then fold them into the account row
+            account.balance_shards = shards
+            account.save(update_fields=['balance_shards'])
+            account.compact_shards()
+            BalanceShard.objects.filter(account=account, index__gte=shards).delete()
+            BalanceShard.objects.bulk_create(
+                [BalanceShard(account=account, index=index) for index in range(shards)],
+                ignore_conflicts=True,
+            )
+        self.stdout.write(self.style.SUCCESS(f"{account.accountNumber} now uses {shards} balance shards."))
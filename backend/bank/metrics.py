@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+logger = logging.getLogger('bank.slow_requests')
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements kept per request for the slow request log
+MAX_CAPTURED_QUERIES = 100
+
+# Stats of the request being handled; None when metrics are off
+_current = ContextVar('bank_request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_time', 'serializer_time', 'captured')
+
+    def __init__(self, capture):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.captured = [] if capture else None
+
+
+class MetricsRegistry:
+    """
+    Per-process metrics, rendered in the Prometheus text format.
+
+    Every worker process keeps its own registry, so scrape each worker (or run a
+    single one) to see all traffic.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view, method, status, duration, stats, size):
+        with self._lock:
+            entry = self._views.get((view, method))
+            if entry is None:
+                entry = self._views[(view, method)] = {
+                    'buckets': [0] * len(LATENCY_BUCKETS), 'count': 0, 'sum': 0.0, 'statuses': {},
+                    'queries': 0, 'query_time': 0.0, 'serializer_time': 0.0, 'bytes': 0,
+                }
+            index = bisect_left(LATENCY_BUCKETS, duration)
+            if index < len(LATENCY_BUCKETS):
+                entry['buckets'][index] += 1
+            entry['count'] += 1
+            entry['sum'] += duration
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+            entry['queries'] += stats.queries
+            entry['query_time'] += stats.query_time
+            entry['serializer_time'] += stats.serializer_time
+            entry['bytes'] += size
+
+    def render(self):
+        with self._lock:
+            views = {key: {**entry, 'buckets': list(entry['buckets']), 'statuses': dict(entry['statuses'])}
+                     for key, entry in self._views.items()}
+
+        lines = []
+        lines += [
+            "# HELP bank_request_duration_seconds Request latency by view.",
+            "# TYPE bank_request_duration_seconds histogram",
+        ]
+        for (view, method), entry in views.items():
+            labels = f'view="{view}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, entry['buckets']):
+                cumulative += count
+                lines.append(f'bank_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'bank_request_duration_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            lines.append(f'bank_request_duration_seconds_sum{{{labels}}} {entry["sum"]:.6f}')
+            lines.append(f'bank_request_duration_seconds_count{{{labels}}} {entry["count"]}')
+
+        lines += ["# HELP bank_requests_total Responses by view and status.", "# TYPE bank_requests_total counter"]
+        for (view, method), entry in views.items():
+            for status, count in sorted(entry['statuses'].items()):
+                lines.append(f'bank_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+
+        for name, key, help_text in [
+            ('bank_db_queries_total', 'queries', "Database queries run while handling requests."),
+            ('bank_db_query_seconds_total', 'query_time', "Time spent in database queries."),
+            ('bank_serializer_seconds_total', 'serializer_time', "Time spent producing serializer data."),
+            ('bank_response_bytes_total', 'bytes', "Response body bytes, excluding streamed responses."),
+        ]:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (view, method), entry in views.items():
+                value = entry[key]
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{view="{view}",method="{method}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def serializer_timer():
+    """Add the block's duration to the current request's serializer time."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - started
+
+
+def _query_wrapper(stats):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.queries += 1
+            stats.query_time += elapsed
+            if stats.captured is not None and len(stats.captured) < MAX_CAPTURED_QUERIES:
+                stats.captured.append((elapsed, sql))
+    return wrapper
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database queries, serializer time and response size per view,
+    and logs requests slower than BANK_SLOW_REQUEST_SECONDS with their SQL.
+
+    When BANK_METRICS_ENABLED is off the middleware removes itself at startup.
+    Database queries are counted on the sync path only: under ASGI the async ORM
+    runs queries on connections that belong to another thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.BANK_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = settings.BANK_SLOW_REQUEST_SECONDS
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats(capture=self.slow_seconds is not None)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_query_wrapper(stats)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(capture=False)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, stats, duration):
+        view = _view_name(request)
+        size = 0 if getattr(response, 'streaming', False) else len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, stats, size)
+
+        if self.slow_seconds is not None and duration >= self.slow_seconds:
+            statements = "".join(
+                f"\n  {elapsed * 1000:.1f}ms {sql}" for elapsed, sql in stats.captured or ()
+            )
+            logger.warning(
+                "Slow request: %s %s (%s) took %.0fms, %d queries in %.0fms, serializers %.0fms%s",
+                request.method, request.path, view, duration * 1000,
+                stats.queries, stats.query_time * 1000, stats.serializer_time * 1000, statements,
+            )
+
+
+def metrics_view(request):
+    """Serve this process's metrics in the Prometheus text format."""
+    if not settings.BANK_METRICS_ENABLED:
+        raise Http404
+    token = settings.BANK_METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    Account = apps.get_model('bank', 'Account')
+    NumberSequence = apps.get_model('bank', 'NumberSequence')
+
+    # Continue account numbers after the highest serial already issued
+    serials = [
+        int(number[12:])
+        for number in Account.objects.values_list('accountNumber', flat=True)
+        if number[12:].isdigit()
+    ]
+    NumberSequence.objects.create(name='account', next_value=max(serials, default=0) + 1)
+
+    # Legacy card numbers all start 123456789012, so new Luhn-checked numbers can't
+    # collide with them until the card serial reaches 789012000.
+    NumberSequence.objects.create(name='card', next_value=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0003_alter_transaction_from_account'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('name', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('next_value', models.BigIntegerField(default=1)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:35
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+def post_opening_balances(apps, schema_editor):
+    Account = apps.get_model('bank', 'Account')
+    JournalEntry = apps.get_model('bank', 'JournalEntry')
+    Posting = apps.get_model('bank', 'Posting')
+
+    # Existing balances predate the journal: open them against the 'opening' account
+    for account in Account.objects.exclude(balance=0).iterator():
+        entry = JournalEntry.objects.create(kind='opening')
+        Posting.objects.bulk_create([
+            Posting(entry=entry, account=account, amount=account.balance),
+            Posting(entry=entry, system_account='opening', amount=-account.balance),
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0007_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JournalEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('transaction', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='journal_entries', to='bank.transaction')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Posting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('system_account', models.CharField(blank=True, choices=[('cash', 'Cash'), ('fee_income', 'Fee income'), ('opening', 'Opening balances')], max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('account', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='postings', to='bank.account')),
+                ('entry', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='postings', to='bank.journalentry')),
+            ],
+        ),
+        migrations.RunPython(post_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0010_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['card_Status', 'expiry_Date'], name='bank_card_status_expiry'),
+        ),
+    ]
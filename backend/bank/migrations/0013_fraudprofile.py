@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0012_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FraudProfile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fraud_profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('state', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
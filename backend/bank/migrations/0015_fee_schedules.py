@@ -0,0 +1,48 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:59
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0014_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='segment',
+            field=models.CharField(default='standard', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='FeeSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('transaction_type', models.CharField(choices=[('withdrawal', 'Withdrawal'), ('transfer', 'Transfer')], max_length=10)),
+                ('segment', models.CharField(blank=True, max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('transaction_type', 'segment'), name='bank_feeschedule_type_segment')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeeTier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('rate', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=6)),
+                ('flat_fee', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('max_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tiers', to='bank.feeschedule')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('schedule', 'min_amount'), name='bank_feetier_schedule_min')],
+            },
+        ),
+    ]
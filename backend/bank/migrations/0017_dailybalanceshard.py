@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-18 21:18
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0016_archivedtransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBalanceShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('index', models.PositiveSmallIntegerField()),
+                ('total_in', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balance_shards', to='bank.account')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('account', 'date', 'index'), name='bank_dailybalanceshard_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 21:22
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0017_dailybalanceshard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailybalance',
+            name='total_sent',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 21:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank', '0018_dailybalance_total_sent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feetier',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,10 +1,13 @@
 import base64
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 import uuid
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.core.validators import MinValueValidator, RegexValidator
@@ -15,11 +18,34 @@ def generate_numeric_id():
     """Generate a unique, 11-digit numeric ID for the user."""
     return ''.join([str(random.randint(0, 9)) for _ in range(11)])
 
-def generate_card_number(last_digits="0000"):
-    """Generate a 16-digit card number with incrementing last 4 digits."""
-    prefix = "123456789012"  # Static prefix for the first 12 digits
-    last_four = str(int(last_digits) + 1).zfill(4)  # Increment last 4 digits
-    return f"{prefix}{last_four}"
+def luhn_check_digit(body):
+    """Return the Luhn check digit that makes ``body + digit`` a valid card number."""
+    total = 0
+    for position, char in enumerate(reversed(body)):
+        digit = int(char)
+        if position % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+CARD_ISSUER_PREFIX = "123456"  # Static issuer prefix for the first 6 digits
+
+def generate_card_number(serial):
+    """Generate a 16-digit card number: issuer prefix, 9-digit serial and a Luhn check digit."""
+    if serial >= 10 ** 9:
+        raise ValidationError("Card number space is exhausted.")
+    body = f"{CARD_ISSUER_PREFIX}{serial:09d}"
+    return body + luhn_check_digit(body)
+
+# Number sequences used by the block allocator in bank/numbering.py
+class NumberSequence(models.Model):
+    name = models.CharField(max_length=30, primary_key=True)
+    next_value = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name}: next {self.next_value}"
 
 # User model
 class User(AbstractUser):
@@ -40,10 +66,18 @@ class User(AbstractUser):
     is_active = models.BooleanField(default=True)
     is_admin = models.BooleanField(default=False)
     address = models.CharField(max_length=50, blank=True, null=True)
+    # Embedded in access tokens; bumping it revokes every token issued so far
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+    # Picks the fee schedules that apply to the customer (see bank/fees.py)
+    segment = models.CharField(max_length=20, default='standard')
 
     def __str__(self):
         return f"{self.first_name} - {self.username}"
 
+    def revoke_tokens(self):
+        self.token_version += 1
+        self.save(update_fields=['token_version'])
+
 # Card model
 class Card(models.Model):
     CARD_STATUS_OPTIONS = [
@@ -57,21 +91,41 @@ class Card(models.Model):
     created_on = models.DateField(auto_now_add=True, blank=True, null=True)
     expiry_Date = models.DateField(editable=False, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # The expiry job's range scan over active cards past their expiry date
+            models.Index(fields=['card_Status', 'expiry_Date'], name='bank_card_status_expiry'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.pk:
             self.expiry_Date = timezone.now().date() + timedelta(days=365)
         if not self.card_number:
-            last_card = Card.objects.all().order_by('-card_number').first()
-            last_digits = last_card.card_number[-4:] if last_card else "0000"
-            self.card_number = generate_card_number(last_digits)
+            from .numbering import card_numbers
+            self.card_number = generate_card_number(card_numbers.allocate())
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Card {self.card_number} for {self.user}"
 
 # Account model
-def generate_Account_number(last_accountNumber):
-    return "098765432100" + str(int(last_accountNumber) + 1)
+ACCOUNT_NUMBER_PREFIX = "098765432100"
+
+def generate_Account_number(serial):
+    return ACCOUNT_NUMBER_PREFIX + str(serial)
+
+class AccountQuerySet(models.QuerySet):
+    def with_visible_balance(self):
+        """Annotate ``visible_balance``: the balance column plus any balance shards."""
+        shard_totals = (
+            BalanceShard.objects.filter(account=OuterRef('pk'))
+            .values('account')
+            .annotate(total=Sum('balance'))
+            .values('total')
+        )
+        return self.annotate(
+            visible_balance=F('balance') + Coalesce(Subquery(shard_totals), Value(Decimal('0.00')))
+        )
 
 class Account(models.Model):
     accountNumber = models.CharField(max_length=20, unique=True, editable=False)
@@ -83,23 +137,84 @@ class Account(models.Model):
         validators=[MinValueValidator(Decimal('0.00'))]
     )
     lastEdited = models.DateTimeField(auto_now=True)
+    # Number of BalanceShard rows credits are spread over; 0 keeps the balance in this row only
+    balance_shards = models.PositiveSmallIntegerField(default=0)
+
+    objects = AccountQuerySet.as_manager()
 
     def save(self, *args, **kwargs):
         if not self.accountNumber:
-            last_account = Account.objects.all().order_by('-accountNumber').first()
-            last_digit = last_account.accountNumber[-4:] if last_account else "0"
-            self.accountNumber = generate_Account_number(last_digit)
+            from .numbering import account_numbers
+            self.accountNumber = generate_Account_number(account_numbers.allocate())
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.accountNumber} - Phone: {self.user.phoneNumber} - Balance: {self.balance}"
 
+    def total_balance(self):
+        """The visible balance, including credits still sitting in balance shards."""
+        if not self.balance_shards:
+            return self.balance
+        return self.balance + (self.shards.aggregate(total=Sum('balance'))['total'] or Decimal('0.00'))
+
     def adjust_balance(self, amount):
-        new_balance = self.balance + Decimal(amount)
-        if new_balance < 0:
-            raise ValidationError("Account balance cannot go below 0.")
-        self.balance = new_balance
-        self.save()
+        amount = Decimal(amount)
+        credited_shard = False
+        if self.balance_shards and amount > 0:
+            # Credits land on a random shard so concurrent receivers rarely share a row
+            credited_shard = BalanceShard.objects.filter(
+                account_id=self.pk, index=random.randrange(self.balance_shards)
+            ).update(balance=F('balance') + amount)
+
+        if not credited_shard:
+            if self.balance_shards and amount < 0:
+                # Debits need the whole balance in the account row
+                self.compact_shards()
+            accounts = Account.objects.filter(pk=self.pk)
+            if amount < 0:
+                # Conditional update: the row is only touched if it can cover the debit
+                accounts = accounts.filter(balance__gte=-amount)
+            updated = accounts.update(balance=F('balance') + amount, lastEdited=timezone.now())
+            if not updated:
+                raise ValidationError("Account balance cannot go below 0.")
+            self.balance += amount
+
+        from .cache import BALANCE, invalidate
+        invalidate([self.user_id], BALANCE)
+
+    def compact_shards(self):
+        """Fold the shard balances back into the account row."""
+        from .snapshots import fold_daily_balance_shards
+
+        with transaction.atomic():
+            moved = Decimal('0.00')
+            # Every shard is locked, empty ones included, so no credit lands until the
+            # shard-level snapshots below have been folded along with the balances
+            for shard in BalanceShard.objects.select_for_update().filter(account_id=self.pk):
+                if not shard.balance:
+                    continue
+                # Subtract only what was read, so credits landing meanwhile are kept
+                BalanceShard.objects.filter(pk=shard.pk).update(balance=F('balance') - shard.balance)
+                moved += shard.balance
+            if moved:
+                Account.objects.filter(pk=self.pk).update(balance=F('balance') + moved, lastEdited=timezone.now())
+                self.balance += moved
+            fold_daily_balance_shards(self.pk)
+        return moved
+
+# Sub-balance of a high fan-in account; see Account.balance_shards
+class BalanceShard(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="shards")
+    index = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'index'], name='bank_balanceshard_account_index'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id}[{self.index}]: {self.balance}"
 
 # Transaction model
 class Transaction(models.Model):
@@ -122,71 +237,271 @@ class Transaction(models.Model):
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
     fee = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'), editable=False)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's history: newest first, id breaks ties
+            models.Index(fields=['user', '-date', '-id'], name='bank_txn_user_date_id'),
+            # Oldest-first scans by the archiver and full exports
+            models.Index(fields=['date', 'id'], name='bank_txn_date_id'),
+        ]
+
     def __str__(self):
         return f"{self.transaction_type.capitalize()} of {self.amount} on {self.date} ({self.id})"
 
     def save(self, *args, **kwargs):
-        
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        # New deposits, withdrawals and transfers are written by the transfer engine,
+        # which applies the balance changes and inserts the row in one atomic block.
         if self.transaction_type == 'withdrawal':
             self.handle_withdrawal()
-
         elif self.transaction_type == 'deposit':
             self.handle_deposit()
-
         elif self.transaction_type == 'transfer':
             self.handle_transfer()
-        self.user = self.account.user
-        super().save(*args, **kwargs)
+        else:
+            self.user_id = self.account.user_id
+            super().save(*args, **kwargs)
 
     def handle_withdrawal(self):
-        if not self.account:
-            raise ValidationError("Withdrawal must have a source account.")
-        if self.amount < Decimal('5.00'):
-            raise ValidationError("Minimum withdrawal amount is 5.")
-        self.fee = self.amount * Decimal('0.02')  # 2% fee
-        total_deduction = self.amount + self.fee
+        from .transfers import execute_withdrawal
+        execute_withdrawal(self)
 
-        if total_deduction > self.account.balance:
-            raise ValidationError("Insufficient funds for withdrawal.")
+    def handle_deposit(self):
+        from .transfers import execute_deposit
+        execute_deposit(self)
 
-        # Deduct the total (amount + fee) from the source account balance
-        self.account.adjust_balance(-total_deduction)
+    def handle_transfer(self):
+        from .transfers import execute_transfer
+        execute_transfer(self)
 
-    def handle_deposit(self):
-        if not self.account:
-            raise ValidationError("Deposit must have a destination account.")
-        if self.amount <= Decimal('0.00'):
-            raise ValidationError("Deposit amount must be positive.")
+# Transactions moved out of the hot table by bank/archive.py. The columns match
+# Transaction's, so history queries and exports can read either table.
+class ArchivedTransaction(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="+")
+    to_account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="+", null=True, blank=True)
+    from_account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="+", null=True, blank=True)
+    date = models.DateTimeField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    fee = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    archived_at = models.DateTimeField(default=timezone.now)
 
-        # Add the amount to the destination account balance
-        balanceNow =self.account.balance
-        self.account.adjust_balance(self.amount)
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='bank_archive_user_date_id'),
+            models.Index(fields=['date', 'id'], name='bank_archive_date_id'),
+        ]
+
+    def __str__(self):
+        return f"Archived {self.transaction_type} of {self.amount} on {self.date} ({self.id})"
+
+# End-of-day balance snapshot, maintained by bank/snapshots.py as transactions are posted
+class DailyBalance(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="daily_balances")
+    date = models.DateField()
+    closing_balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_in = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_out = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_fees = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    # The part of total_out sent as transfers, which DAILY_TRANSFER_LIMIT caps
+    total_sent = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date'], name='bank_dailybalance_account_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} on {self.date}: {self.closing_balance}"
+
+# Shard-level credits of a sharded account's DailyBalance, folded in by Account.compact_shards
+class DailyBalanceShard(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="daily_balance_shards")
+    date = models.DateField()
+    index = models.PositiveSmallIntegerField()
+    total_in = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date', 'index'], name='bank_dailybalanceshard_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id}[{self.index}] on {self.date}: +{self.total_in}"
+
+# Append-only double-entry journal, written by bank/ledger.py for every posted transaction
+class JournalEntry(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Plain references without constraints: the journal outlives deleted rows
+    transaction = models.ForeignKey(
+        Transaction, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name="journal_entries", null=True, blank=True,
+    )
+    kind = models.CharField(max_length=10)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.kind.capitalize()} entry {self.id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError("Journal entries are immutable.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Journal entries are immutable.")
+
+class Posting(models.Model):
+    SYSTEM_ACCOUNTS = [
+        ('cash', 'Cash'),
+        ('fee_income', 'Fee income'),
+        ('opening', 'Opening balances'),
+    ]
+    entry = models.ForeignKey(JournalEntry, on_delete=models.DO_NOTHING, db_constraint=False, related_name="postings")
+    # Exactly one of account / system_account is set
+    account = models.ForeignKey(
+        Account, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name="postings", null=True, blank=True,
+    )
+    system_account = models.CharField(max_length=10, choices=SYSTEM_ACCOUNTS, blank=True)
+    # Change to the ledger account's balance; the postings of an entry sum to zero
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.account_id or self.system_account}: {self.amount}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError("Postings are immutable.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Postings are immutable.")
+
+# Stored response of a POST made with an Idempotency-Key header (see bank/idempotency.py)
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='bank_idempotencykey_user_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} for {self.user_id}"
+
+# Event waiting to be delivered to downstream systems, written in the same
+# transaction as the change it describes and drained by bank/outbox.py
+class OutboxEvent(models.Model):
+    STATUS_OPTIONS = [
+        ('pending', 'Pending'),
+        ('dead', 'Dead'),
+    ]
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_OPTIONS, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Not retried before this time
+    available_at = models.DateTimeField(default=timezone.now)
+    # A worker owns the event until its lease runs out
+    lease_owner = models.CharField(max_length=64, blank=True)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='bank_outbox_status_available'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk} ({self.status})"
+
+# Persisted rolling transfer features of a user, kept by bank/fraud.py
+class FraudProfile(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="fraud_profile")
+    state = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fraud profile of {self.user_id}"
+
+# Per-account monthly totals by transaction type and counterparty, kept by bank/analytics.py
+class MonthlyRollup(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="monthly_rollups")
+    # First day of the month
+    month = models.DateField()
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    # The other account's number for transfers, blank for deposits and withdrawals
+    counterparty = models.CharField(max_length=20, blank=True, default='')
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    fees = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['account', 'month', 'transaction_type', 'counterparty'], name='bank_rollup_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} {self.month:%Y-%m} {self.transaction_type} {self.counterparty}: {self.amount}"
+
+# Fees charged on a transaction type, optionally only for one customer segment.
+# Compiled into an in-memory lookup table by bank/fees.py.
+class FeeSchedule(models.Model):
+    CHARGEABLE_TYPES = [
+        ('withdrawal', 'Withdrawal'),
+        ('transfer', 'Transfer'),
+    ]
+    name = models.CharField(max_length=50)
+    transaction_type = models.CharField(max_length=10, choices=CHARGEABLE_TYPES)
+    # Blank applies to every segment without a schedule of its own
+    segment = models.CharField(max_length=20, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['transaction_type', 'segment'], name='bank_feeschedule_type_segment'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.transaction_type}, {self.segment or 'all segments'})"
+
+# One band of a fee schedule: amounts from min_amount up to the next tier pay
+# flat_fee + amount * rate, capped at max_fee
+class FeeTier(models.Model):
+    schedule = models.ForeignKey(FeeSchedule, on_delete=models.CASCADE, related_name="tiers")
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    rate = models.DecimalField(max_digits=6, decimal_places=4, default=Decimal('0.0000'))
+    flat_fee = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    max_fee = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'min_amount'], name='bank_feetier_schedule_min'),
+        ]
+
+    def __str__(self):
+        return f"{self.schedule_id} from {self.min_amount}"
 
-    def handle_transfer(self):
-        if not self.account or not self.to_account:
-            raise ValidationError("Transfer must specify both from and to accounts.")
-        if self.amount < Decimal('5.00'):
-            raise ValidationError("Minimum transfer amount is 5.")
-
-        self.fee = self.amount * Decimal('0.02')  # 2% fee
-        total_deduction = self.amount + self.fee
-
-        if total_deduction > self.account.balance:
-            raise ValidationError("Insufficient funds for transfer.")
-
-        # Deduct from sender and add to recipient
-        self.account.adjust_balance(-total_deduction)
-        self.to_account.adjust_balance(self.amount)
-
-        # Create a complementary "received" transaction for the recipient
-        Transaction.objects.create(
-            account=self.to_account,
-            from_account=self.account,
-            amount=self.amount,
-            transaction_type='received'
-        )
 # Signal to automatically create account for new users
 @receiver(post_save, sender=User)
 def create_user_account(sender, instance, created, **kwargs):
-    if created:
+    # Callers may create the account themselves in the same transaction (RegisterSerializer)
+    if created and not Account.objects.filter(user=instance).exists():
         Account.objects.create(user=instance, balance=Decimal('0.00'))
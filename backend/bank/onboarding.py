@@ -0,0 +1,171 @@
+import csv
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Account, Card, Transaction, User, generate_Account_number, generate_card_number, generate_numeric_id
+from .numbering import account_numbers, card_numbers
+from .transfers import CENTS, post_transactions
+
+# Bulk onboarding of customers from CSV, e.g. when migrating another bank's users.
+# Each chunk of rows becomes one transaction with a bulk insert per table, instead
+# of a User insert plus the create_user_account post_save receiver per customer.
+
+REQUIRED_COLUMNS = ['phoneNumber', 'first_name', 'last_name', 'password']
+OPTIONAL_COLUMNS = ['email', 'address', 'dob', 'SSN', 'balance']
+# Inserts of a chunk tried before its remaining rows are rejected
+INSERT_ATTEMPTS = 3
+
+
+def init_hash_worker():
+    """ProcessPoolExecutor initializer: spawned workers need Django set up to hash."""
+    django.setup()
+
+
+def read_chunks(fileobj, chunk_size):
+    """Yield ``(line_number, row)`` lists of up to ``chunk_size`` CSV rows without reading the whole file."""
+    reader = csv.DictReader(fileobj)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    # The header is line 1
+    rows = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _clean(row):
+    """Return the row's User fields and opening balance, or raise ValueError."""
+    values = {column: (row.get(column) or '').strip() for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+    phone = values['phoneNumber']
+    if not (phone.isdigit() and len(phone) == 10):
+        raise ValueError("phoneNumber must be 10 digits.")
+    if not values['first_name'] or not values['last_name']:
+        raise ValueError("first_name and last_name are required.")
+    if not values['password']:
+        raise ValueError("password is required.")
+
+    fields = {
+        'username': phone,
+        'phoneNumber': phone,
+        'first_name': values['first_name'][:30],
+        'last_name': values['last_name'][:30],
+        'email': values['email'] or None,
+        'address': values['address'][:50] or None,
+    }
+    if values['dob']:
+        fields['dob'] = parse_date(values['dob'])
+        if fields['dob'] is None:
+            raise ValueError("dob must be a YYYY-MM-DD date.")
+    if values['SSN']:
+        if not values['SSN'].isdigit():
+            raise ValueError("SSN must be numeric.")
+        fields['SSN'] = int(values['SSN'])
+    try:
+        balance = Decimal(values['balance'] or '0').quantize(CENTS)
+    except InvalidOperation:
+        raise ValueError("balance must be a number.")
+    if balance < 0:
+        raise ValueError("balance cannot be negative.")
+    return fields, values['password'], balance
+
+
+def taken_phones(phones):
+    """Return the phone numbers in ``phones`` already used as a phoneNumber or username."""
+    return set(
+        User.objects.filter(phoneNumber__in=phones).values_list('phoneNumber', flat=True)
+    ) | set(User.objects.filter(username__in=phones).values_list('username', flat=True))
+
+
+def _insert(users, balances):
+    """Create ``users`` with an account (opening ``balances``) and a card each, in one transaction."""
+    expiry = timezone.now().date() + timedelta(days=365)
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        account_serials = account_numbers.allocate_range(len(users))
+        card_serials = card_numbers.allocate_range(len(users))
+        accounts = [
+            Account(user=user, accountNumber=generate_Account_number(serial), balance=balance)
+            for user, serial, balance in zip(users, account_serials, balances)
+        ]
+        Account.objects.bulk_create(accounts)
+        Card.objects.bulk_create([
+            Card(user=user, card_number=generate_card_number(serial), expiry_Date=expiry)
+            for user, serial in zip(users, card_serials)
+        ])
+        # Migrated balances go through the ledger as opening deposits
+        funded = [account for account in accounts if account.balance]
+        if funded:
+            post_transactions([
+                Transaction(account=account, user_id=account.user_id, amount=account.balance, transaction_type='deposit')
+                for account in funded
+            ], funded)
+
+
+def import_chunk(chunk, hash_map=map):
+    """
+    Create users, their accounts and cards for one chunk of ``(line_number, row)``.
+
+    ``hash_map`` hashes the passwords, e.g. a process pool's ``map``. Rows that are
+    invalid or whose phone number is already taken (in the database or earlier in
+    the chunk) are skipped. Returns ``(created, errors)`` with errors as
+    ``(line_number, message)``.
+
+    The phone check and the random user ids come before the insert, so a signup or
+    another import can still collide with the chunk. Its insert then rolls back and
+    is retried with fresh ids, without the rows whose phone number got taken.
+    """
+    errors = []
+    cleaned = []
+    phones = set()
+    for line, row in chunk:
+        try:
+            fields, password, balance = _clean(row)
+        except ValueError as exc:
+            errors.append((line, str(exc)))
+            continue
+        if fields['phoneNumber'] in phones:
+            errors.append((line, "Duplicate phoneNumber in file."))
+            continue
+        phones.add(fields['phoneNumber'])
+        cleaned.append((line, fields, password, balance))
+
+    for attempt in range(INSERT_ATTEMPTS):
+        taken = taken_phones([fields['phoneNumber'] for _, fields, _, _ in cleaned])
+        if taken:
+            errors += [(line, "phoneNumber is already registered.") for line, fields, _, _ in cleaned
+                       if fields['phoneNumber'] in taken]
+            cleaned = [item for item in cleaned if item[1]['phoneNumber'] not in taken]
+        if not cleaned:
+            return 0, errors
+
+        if attempt == 0:
+            hashes = dict(zip(
+                [line for line, _, _, _ in cleaned],
+                hash_map(make_password, [password for _, _, password, _ in cleaned]),
+            ))
+        users = [User(id=generate_numeric_id(), password=hashes[line], **fields)
+                 for line, fields, _, _ in cleaned]
+        try:
+            _insert(users, [balance for _, _, _, balance in cleaned])
+        except IntegrityError:
+            continue
+        return len(users), errors
+
+    errors += [(line, "Could not be imported; try again.") for line, _, _, _ in cleaned]
+    return 0, errors
+
+
+def import_users(fileobj, chunk_size=1000, hash_map=map):
+    """Import a CSV file chunk by chunk; yields ``(created, errors)`` per chunk."""
+    for chunk in read_chunks(fileobj, chunk_size):
+        yield import_chunk(chunk, hash_map)
@@ -0,0 +1,115 @@
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import timedelta
+from http.client import HTTPException
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import OutboxEvent, User
+from .signals import transactions_posted
+
+TRANSACTION_POSTED = 'transaction.posted'
+USER_REGISTERED = 'user.registered'
+SIGNATURE_HEADER = 'X-Bank-Signature'
+
+
+@receiver(transactions_posted)
+def record_transaction_events(sender, transactions, **kwargs):
+    """One event per posted row, in the posting transaction, so an event exists exactly when its row does."""
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(topic=TRANSACTION_POSTED, payload={
+            'id': txn.id,
+            'user': txn.user_id,
+            'account': txn.account_id,
+            'to_account': txn.to_account_id,
+            'from_account': txn.from_account_id,
+            'transaction_type': txn.transaction_type,
+            'amount': txn.amount,
+            'fee': txn.fee,
+            'date': txn.date,
+        })
+        for txn in transactions
+    ])
+
+
+@receiver(post_save, sender=User)
+def record_registration_event(sender, instance, created, **kwargs):
+    if created:
+        OutboxEvent.objects.create(topic=USER_REGISTERED, payload={
+            'id': instance.pk, 'phoneNumber': instance.phoneNumber, 'date_joined': instance.date_joined,
+        })
+
+
+def claim(worker, batch_size, lease_seconds):
+    """
+    Lease up to ``batch_size`` due events to ``worker`` and return them, oldest first.
+
+    Claiming is a conditional UPDATE over unleased (or lapsed) rows under a token
+    unique to this claim, so parallel workers never receive the same event.
+    """
+    now = timezone.now()
+    token = f"{worker}:{uuid.uuid4().hex[:12]}"
+    claimable = OutboxEvent.objects.filter(status='pending', available_at__lte=now).filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now)
+    )
+    ids = list(claimable.order_by('available_at', 'id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    claimable.filter(pk__in=ids).update(lease_owner=token, leased_until=now + timedelta(seconds=lease_seconds))
+    return list(OutboxEvent.objects.filter(lease_owner=token).order_by('id'))
+
+
+def sign(body):
+    secret = settings.OUTBOX_WEBHOOK_SECRET
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest() if secret else ''
+
+
+def post_events(url, events):
+    """POST a batch of events as one JSON document; receivers dedupe on the event id."""
+    body = json.dumps({'events': [
+        {'id': event.pk, 'topic': event.topic, 'created_at': event.created_at, 'payload': event.payload}
+        for event in events
+    ]}, cls=DjangoJSONEncoder).encode()
+    request = Request(url, data=body, method='POST', headers={'Content-Type': 'application/json'})
+    signature = sign(body)
+    if signature:
+        request.add_header(SIGNATURE_HEADER, f"sha256={signature}")
+    with urlopen(request, timeout=settings.OUTBOX_WEBHOOK_TIMEOUT) as response:
+        response.read()
+
+
+def deliver(events):
+    """
+    Send the claimed events to every configured webhook. Delivered events are
+    deleted; on failure they are released for a retry with exponential backoff,
+    or marked dead after OUTBOX_MAX_ATTEMPTS. Returns ``(delivered, failed)``.
+    """
+    if not events:
+        return 0, 0
+    ids = [event.pk for event in events]
+    owned = OutboxEvent.objects.filter(pk__in=ids, lease_owner=events[0].lease_owner)
+    try:
+        for url in settings.OUTBOX_WEBHOOK_URLS:
+            post_events(url, events)
+    except (URLError, HTTPException, OSError, ValueError) as exc:
+        now = timezone.now()
+        # One UPDATE per distinct attempt count, which sets the backoff
+        for attempts in {event.attempts + 1 for event in events}:
+            owned.filter(attempts=attempts - 1).update(
+                attempts=attempts,
+                status='dead' if attempts >= settings.OUTBOX_MAX_ATTEMPTS else 'pending',
+                available_at=now + timedelta(seconds=min(2 ** attempts, 3600)),
+                lease_owner='', leased_until=None, last_error=str(exc)[:1000],
+            )
+        return 0, len(events)
+    owned.delete()
+    return len(events), 0
@@ -0,0 +1,90 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Account
+from .signals import transactions_posted
+
+# Reads go to the primary unless a view opts in with reading_from(); the transfer
+# engine's locking reads must never land on a replica.
+_read_alias = ContextVar('bank_read_alias', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def _cache():
+    return caches[settings.BANK_CACHE_ALIAS]
+
+
+def pin_key(user_id):
+    return f"bank:pin:{user_id}"
+
+
+def read_alias_for(user_id):
+    """Pick a replica for the user's reads, or None (primary) while they are pinned after a write."""
+    if not settings.DATABASE_REPLICAS or _cache().get(pin_key(user_id)):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+async def aread_alias_for(user_id):
+    """Async read_alias_for()."""
+    if not settings.DATABASE_REPLICAS or await _cache().aget(pin_key(user_id)):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def reading_from(alias):
+    """Route the block's ORM reads to ``alias``; None keeps them on the primary."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def pin_to_primary(user_ids):
+    """
+    Send the users' reads to the primary for REPLICA_PIN_SECONDS so they see their
+    own writes while the replicas catch up. Inside a database transaction the pin is
+    renewed after commit, when replication of the write actually starts.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return
+    keys = {pin_key(user_id): True for user_id in set(user_ids)}
+    _cache().set_many(keys, settings.REPLICA_PIN_SECONDS)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _cache().set_many(keys, settings.REPLICA_PIN_SECONDS))
+
+
+@receiver(transactions_posted)
+def pin_posted_users(sender, transactions, **kwargs):
+    # Covers recipients too, whose balance and history changed as well
+    pin_to_primary([txn.user_id for txn in transactions])
+
+
+@receiver(post_save, sender=Account)
+def pin_account_owner(sender, instance, **kwargs):
+    pin_to_primary([instance.user_id])
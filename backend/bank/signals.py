@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Sent by the transfer engine right after it inserts ledger rows, inside the same
+# database transaction. Receivers get ``transactions`` (the inserted Transaction
+# rows), ``balances`` ({account pk: balance after the rows were applied}) and
+# ``sharded`` ({account pk: balance shard count} for the sharded accounts, which
+# ``balances`` leaves out).
+transactions_posted = Signal()
@@ -0,0 +1,220 @@
+import random
+from collections import defaultdict
+from decimal import Decimal
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Account, ArchivedTransaction, BalanceShard, DailyBalance, DailyBalanceShard, Transaction
+from .signals import transactions_posted
+from .upserts import add_or_insert
+
+CREDIT_TYPES = ('deposit', 'received')
+DEBIT_TYPES = ('withdrawal', 'transfer')
+ZERO = Decimal('0.00')
+CENTS = Decimal('0.01')
+
+
+def transaction_flows(txn):
+    """Return (money in, money out, fee) for one ledger row, from its account's point of view."""
+    if txn.transaction_type in CREDIT_TYPES:
+        return txn.amount, ZERO, ZERO
+    return ZERO, txn.amount, txn.fee
+
+
+@receiver(transactions_posted)
+def record_daily_balances(sender, transactions, balances, sharded=None, **kwargs):
+    """Fold freshly posted rows into their accounts' end-of-day snapshots."""
+    sharded = sharded or {}
+    days = defaultdict(lambda: [ZERO, ZERO, ZERO, ZERO, 0])
+    credits = defaultdict(lambda: [ZERO, 0])
+    for txn in transactions:
+        day = timezone.localdate(txn.date)
+        money_in, money_out, fee = transaction_flows(txn)
+        if txn.account_id in sharded and txn.transaction_type in CREDIT_TYPES:
+            # Credits to a sharded account skip its one snapshot row, like its balance does
+            totals = credits[(txn.account_id, day)]
+            totals[0] += money_in
+            totals[1] += 1
+            continue
+        totals = days[(txn.account_id, day)]
+        totals[0] += money_in
+        totals[1] += money_out
+        totals[2] += fee
+        if txn.transaction_type == 'transfer':
+            totals[3] += txn.amount
+        totals[4] += 1
+
+    for (account_id, day), (money_in, count) in credits.items():
+        add_or_insert(
+            DailyBalanceShard,
+            {'account_id': account_id, 'date': day, 'index': random.randrange(sharded[account_id])},
+            {'total_in': money_in, 'transaction_count': count},
+        )
+
+    for (account_id, day), (money_in, money_out, fees, sent, count) in days.items():
+        balance = balances.get(account_id)
+        if balance is None:
+            balance = Account.objects.get(pk=account_id).total_balance()
+        _add_to_day(account_id, day, money_in, money_out, fees, sent, count, balance)
+
+
+def _add_to_day(account_id, day, money_in, money_out, fees, sent, count, balance):
+    """Add one day's flows to an account's snapshot; ``balance`` is its balance once they're applied."""
+    net = money_in - money_out - fees
+    closing = balance
+    if day < timezone.localdate():
+        # Backdated rows also move every later closing balance
+        later = DailyBalance.objects.filter(account_id=account_id, date__gt=day)
+        later.update(closing_balance=F('closing_balance') + net)
+        later_net = later.aggregate(
+            net=Sum(F('total_in') - F('total_out') - F('total_fees'))
+        )['net']
+        closing -= later_net or ZERO
+    add_or_insert(
+        DailyBalance,
+        {'account_id': account_id, 'date': day},
+        {
+            'closing_balance': net, 'total_in': money_in, 'total_out': money_out,
+            'total_fees': fees, 'total_sent': sent, 'transaction_count': count,
+        },
+        initial={'closing_balance': closing},
+    )
+
+
+def fold_daily_balance_shards(account_id):
+    """
+    Move a sharded account's shard-level credits into its DailyBalance rows. Called
+    by Account.compact_shards with the balance shards locked and folded, so the
+    account row holds every credit being moved.
+    """
+    rows = list(
+        DailyBalanceShard.objects.select_for_update()
+        .filter(account_id=account_id)
+        .values_list('pk', 'date', 'total_in', 'transaction_count')
+    )
+    if not rows:
+        return
+    days = defaultdict(lambda: [ZERO, 0])
+    for pk, day, money_in, count in rows:
+        days[day][0] += Decimal(money_in)
+        days[day][1] += count
+    DailyBalanceShard.objects.filter(pk__in=[row[0] for row in rows]).delete()
+
+    balance = Account.objects.filter(pk=account_id).values_list('balance', flat=True).get()
+    # Oldest day first; credits of later days aren't in any snapshot yet
+    pending = sum((money_in for money_in, count in days.values()), ZERO)
+    for day in sorted(days):
+        money_in, count = days[day]
+        pending -= money_in
+        _add_to_day(account_id, day, money_in, ZERO, ZERO, ZERO, count, balance - pending)
+
+
+def build_statement(account, date_from, date_to):
+    """
+    Opening/closing balance and totals for ``account`` between two dates, inclusive.
+
+    Reads the last snapshot before the period for the opening balance and sums the
+    period's daily snapshots, so the cost doesn't depend on the account's history.
+    """
+    opening = (
+        DailyBalance.objects.filter(account=account, date__lt=date_from)
+        .order_by('-date')
+        .values_list('closing_balance', flat=True)
+        .first()
+    ) or ZERO
+    totals = DailyBalance.objects.filter(account=account, date__range=(date_from, date_to)).aggregate(
+        total_in=Sum('total_in'),
+        total_out=Sum('total_out'),
+        total_fees=Sum('total_fees'),
+        transaction_count=Sum('transaction_count'),
+    )
+    total_in = totals['total_in'] or ZERO
+    total_out = totals['total_out'] or ZERO
+    total_fees = totals['total_fees'] or ZERO
+    transaction_count = totals['transaction_count'] or 0
+    if account.balance_shards:
+        # Shard-level credits not folded into the snapshots yet
+        credits = DailyBalanceShard.objects.filter(account=account, date__lte=date_to).aggregate(
+            before=Sum('total_in', filter=Q(date__lt=date_from)),
+            total_in=Sum('total_in', filter=Q(date__gte=date_from)),
+            transaction_count=Sum('transaction_count', filter=Q(date__gte=date_from)),
+        )
+        opening += Decimal(credits['before'] or ZERO)
+        total_in += Decimal(credits['total_in'] or ZERO)
+        transaction_count += credits['transaction_count'] or 0
+    closing = opening + total_in - total_out - total_fees
+    return {
+        'account': account.accountNumber,
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'opening_balance': _money(opening),
+        'closing_balance': _money(closing),
+        'total_in': _money(total_in),
+        'total_out': _money(total_out),
+        'total_fees': _money(total_fees),
+        'transaction_count': transaction_count,
+    }
+
+
+def _money(value):
+    # Formatted like DecimalField output from the serializers
+    return str(value.quantize(CENTS))
+
+
+def rebuild_daily_balances(account_ids):
+    """
+    Recompute the snapshots of the given accounts from their full history.
+
+    Days are aggregated in the database, then closing balances are walked
+    backwards from each account's current balance.
+    """
+    # Lock the accounts and their balance shards first so no transfer lands between
+    # reading balances and history
+    list(BalanceShard.objects.select_for_update().filter(account_id__in=account_ids).values_list('pk', flat=True))
+    closing = dict(
+        Account.objects.select_for_update().filter(pk__in=account_ids)
+        .with_visible_balance()
+        .values_list('pk', 'visible_balance')
+    )
+    # Archived history counts too; a day can straddle the archive cutoff
+    days = defaultdict(lambda: [ZERO, ZERO, ZERO, ZERO, 0])
+    for model in (Transaction, ArchivedTransaction):
+        rows = (
+            model.objects.filter(account_id__in=account_ids)
+            .annotate(day=TruncDate('date'))
+            .values('account_id', 'day')
+            .annotate(
+                total_in=Sum('amount', filter=Q(transaction_type__in=CREDIT_TYPES)),
+                total_out=Sum('amount', filter=Q(transaction_type__in=DEBIT_TYPES)),
+                total_fees=Sum('fee'),
+                total_sent=Sum('amount', filter=Q(transaction_type='transfer')),
+                transaction_count=Count('id'),
+            )
+            .order_by()
+        )
+        for row in rows:
+            totals = days[(row['account_id'], row['day'])]
+            totals[0] += row['total_in'] or ZERO
+            totals[1] += row['total_out'] or ZERO
+            totals[2] += row['total_fees'] or ZERO
+            totals[3] += row['total_sent'] or ZERO
+            totals[4] += row['transaction_count']
+
+    snapshots = []
+    # Newest day first within each account
+    for (account_id, day), (money_in, money_out, fees, sent, count) in sorted(days.items(), reverse=True):
+        snapshots.append(DailyBalance(
+            account_id=account_id, date=day,
+            closing_balance=closing[account_id],
+            total_in=money_in, total_out=money_out, total_fees=fees, total_sent=sent,
+            transaction_count=count,
+        ))
+        closing[account_id] -= money_in - money_out - fees
+
+    # The visible balance already counts the shard-level credits
+    DailyBalanceShard.objects.filter(account_id__in=account_ids).delete()
+    DailyBalance.objects.filter(account_id__in=account_ids).delete()
+    DailyBalance.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bank.archive import ARCHIVED_FIELDS, HORIZON_KEY, archive_before, archive_horizon
+from bank.models import ArchivedTransaction, Transaction
+
+from .test_transfers import make_user
+
+
+@override_settings(FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class ArchiveTests(TestCase):
+    def setUp(self):
+        caches[settings.BANK_CACHE_ALIAS].delete(HORIZON_KEY)
+        _, self.sender = make_user('0700000070', Decimal('1000.00'))
+        _, self.recipient = make_user('0700000071')
+
+    def transfer(self, amount='10.00'):
+        Transaction(account=self.sender, to_account=self.recipient, amount=Decimal(amount),
+                    transaction_type='transfer').save()
+
+    def test_an_empty_archive_is_not_cached(self):
+        self.assertIsNone(archive_horizon())
+        # Rows archived by another process, which this process's cache doesn't hear about
+        row = Transaction.objects.filter(account=self.sender).values(*ARCHIVED_FIELDS).first()
+        ArchivedTransaction.objects.create(**row)
+        self.assertEqual(archive_horizon(), row['date'])
+
+    def test_rescore_reads_archived_transfers(self):
+        for _ in range(3):
+            self.transfer()
+        self.assertEqual(sum(archive_before(timezone.now() + timedelta(days=1))), 6 + 1)
+        out = StringIO()
+        call_command('rescore_transfers', stdout=out)
+        self.assertIn("Scored 3 transfers", out.getvalue())
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from bank.api.async_views import AsyncAPIView, CachedAsyncAPIView
+from bank.authentication import BankRefreshToken
+from bank.cache import BALANCE
+from bank.models import User
+
+
+class AsyncViewDefinitionTests(TestCase):
+    def test_views_must_define_their_hooks(self):
+        with self.assertRaisesMessage(TypeError, "NoRespond must define respond."):
+            type('NoRespond', (AsyncAPIView,), {})
+        with self.assertRaisesMessage(TypeError, "NoBuild must define build."):
+            type('NoBuild', (CachedAsyncAPIView,), {'cache_kind': BALANCE})
+        with self.assertRaisesMessage(TypeError, "NoKind must define cache_kind."):
+            type('NoKind', (CachedAsyncAPIView,), {'build': lambda self, request: None})
+
+    def test_abstract_views_may_leave_hooks_out(self):
+        class Base(AsyncAPIView, abstract=True):
+            pass
+
+        self.assertTrue(issubclass(Base, AsyncAPIView))
+
+
+@override_settings(
+    BANK_THROTTLE_ENABLED=True,
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'ip': '1000/min', 'user': '2/min'},
+    },
+)
+class AsyncThrottleTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='0700000030', phoneNumber='0700000030', password='pass1234')
+        self.headers = {'Authorization': f'Bearer {BankRefreshToken.for_user(user).access_token}'}
+
+    async def test_async_endpoints_share_the_user_throttle(self):
+        for path in ('/api/async/balance/', '/api/async/getmyprofile/'):
+            response = await self.async_client.get(path, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get('/api/async/mycards/', headers=self.headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.authentication import BankRefreshToken, revocations
+from bank.models import User
+
+
+def forget_token_states():
+    """What another process sees: nothing cached locally or in its own cache."""
+    caches[settings.BANK_CACHE_ALIAS].clear()
+    revocations._entries.clear()
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False)
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        forget_token_states()
+        self.user = User.objects.create_user(username='0700000030', phoneNumber='0700000030', password='pass1234')
+        token = BankRefreshToken.for_user(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def test_valid_token_is_accepted_on_a_cache_miss(self):
+        forget_token_states()
+        self.assertEqual(self.client.get('/api/balance/').status_code, 200)
+
+    def test_deactivation_applies_on_a_cache_miss(self):
+        # Saved without the post_save receiver, as if by another process with its own cache
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        forget_token_states()
+        self.assertEqual(self.client.get('/api/balance/').status_code, 401)
+
+    def test_revocation_applies_on_a_cache_miss(self):
+        User.objects.filter(pk=self.user.pk).update(token_version=1)
+        forget_token_states()
+        self.assertEqual(self.client.get('/api/balance/').status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        User.objects.filter(pk=self.user.pk).delete()
+        forget_token_states()
+        self.assertEqual(self.client.get('/api/balance/').status_code, 401)
+
+    async def test_async_views_check_the_database_on_a_cache_miss(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        forget_token_states()
+        response = await self.async_client.get('/api/async/balance/', headers=self.headers)
+        self.assertEqual(response.status_code, 401)
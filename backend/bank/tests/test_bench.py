@@ -0,0 +1,26 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from bank.benchmarks import to_cents
+
+
+class ToCentsTests(SimpleTestCase):
+    def test_float_noise_from_sqlite_sums_is_rounded_away(self):
+        balances = Decimal('99131.8800000001')
+        fees = Decimal('868.120000000001')
+        self.assertEqual(to_cents(balances) + to_cents(fees), Decimal('100000.00'))
+
+    def test_empty_sum_is_zero(self):
+        self.assertEqual(to_cents(None), Decimal('0.00'))
+
+
+@override_settings(FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class BenchTransfersTests(TransactionTestCase):
+    def test_concurrent_transfers_conserve_money(self):
+        out = StringIO()
+        call_command('bench_transfers', workers=2, transfers=25, accounts=3,
+                     opening_balance=Decimal('1000.01'), stdout=out)
+        self.assertIn("No lost updates", out.getvalue())
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.conf import settings
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.cache import BALANCE, _entry, etag_matches, get_or_build
+from bank.models import Account, User
+
+
+class EntryTests(SimpleTestCase):
+    def test_cached_data_keeps_the_serializer_field_order(self):
+        data, _ = _entry({'b': 1, 'a': [{'z': 1, 'y': 2}]})
+        self.assertEqual(list(data), ['b', 'a'])
+        self.assertEqual(list(data['a'][0]), ['z', 'y'])
+
+
+class EtagMatchesTests(SimpleTestCase):
+    etag = '"0123abcd"'
+
+    def test_matches_any_listed_etag(self):
+        self.assertTrue(etag_matches(self.etag, '"other", "0123abcd"'))
+        self.assertTrue(etag_matches(self.etag, 'W/"0123abcd"'))
+        self.assertTrue(etag_matches(self.etag, '*'))
+
+    def test_substrings_and_missing_headers_do_not_match(self):
+        self.assertFalse(etag_matches(self.etag, '"0123abcd-extra"'))
+        self.assertFalse(etag_matches(self.etag, '0123'))
+        self.assertFalse(etag_matches(self.etag, None))
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False)
+class CachedResponseTests(TestCase):
+    def setUp(self):
+        caches[settings.BANK_CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(username='0700000020', phoneNumber='0700000020', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cached_response_matches_the_uncached_one(self):
+        first = self.client.get('/api/getmyprofile/')
+        second = self.client.get('/api/getmyprofile/')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(list(first.json()), ['id', 'username', 'first_name', 'last_name', 'phoneNumber', 'email', 'address'])
+
+    def test_if_none_match(self):
+        etag = self.client.get('/api/getmyprofile/')['ETag']
+        self.assertEqual(self.client.get('/api/getmyprofile/', HTTP_IF_NONE_MATCH=f'"stale", {etag}').status_code, 304)
+        self.assertEqual(self.client.get('/api/getmyprofile/', HTTP_IF_NONE_MATCH=etag[1:-3]).status_code, 200)
+
+
+class InvalidationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='0700000021', phoneNumber='0700000021', password='pass1234')
+        self.account = Account.objects.get(user=self.user)
+
+    def balance(self):
+        return {'balance': str(Account.objects.get(pk=self.account.pk).total_balance())}
+
+    def test_a_build_racing_a_committed_write_is_not_served_afterwards(self):
+        def build_then_write():
+            # The reader has read the old balance when the writer commits
+            data = self.balance()
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.account.adjust_balance(Decimal('5.00'))
+            return data
+
+        stale, _ = get_or_build(BALANCE, self.user.pk, build_then_write)
+        self.assertEqual(stale, {'balance': '0.00'})
+        fresh, _ = get_or_build(BALANCE, self.user.pk, self.balance)
+        self.assertEqual(fresh, {'balance': '5.00'})
+
+    def test_entries_are_reused_until_invalidated(self):
+        first = get_or_build(BALANCE, self.user.pk, self.balance)
+        self.assertEqual(get_or_build(BALANCE, self.user.pk, lambda: self.fail("rebuilt")), first)
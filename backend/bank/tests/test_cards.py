@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from bank import cards
+from bank.cards import CARD_VALIDITY, expire_cards
+from bank.models import Card
+
+from .test_transfers import make_user
+
+
+def make_cards(count, days_past_expiry=1, first=0):
+    issued = []
+    for n in range(count):
+        user, _ = make_user(f'07000001{20 + first + n:02d}')
+        card = Card(user=user)
+        card.save()
+        issued.append(card)
+    expiry = timezone.localdate() - timedelta(days=days_past_expiry)
+    Card.objects.filter(pk__in=[card.pk for card in issued]).update(expiry_Date=expiry)
+    return issued
+
+
+@contextmanager
+def before_each_chunk(change):
+    """Run ``change()`` after a chunk has read its card ids, before it locks and updates them."""
+    def atomic(*args, **kwargs):
+        change()
+        return transaction.atomic(*args, **kwargs)
+
+    with mock.patch.object(cards, 'transaction', SimpleNamespace(atomic=atomic)):
+        yield
+
+
+class ExpireCardsTests(TestCase):
+    def statuses(self, issued):
+        return [Card.objects.get(pk=card.pk).card_Status for card in issued]
+
+    def replacements(self, card):
+        return Card.objects.filter(user_id=card.user_id).exclude(pk=card.pk)
+
+    def test_works_through_the_due_cards_in_chunks(self):
+        issued = make_cards(5)
+        self.assertEqual(list(expire_cards(chunk_size=2)), [(2, 2), (2, 2), (1, 1)])
+        self.assertEqual(self.statuses(issued), ['expired'] * 5)
+        for card in issued:
+            replacement = self.replacements(card).get()
+            self.assertEqual(replacement.card_Status, 'active')
+            self.assertEqual(replacement.expiry_Date, timezone.localdate() + CARD_VALIDITY)
+
+    def test_each_expired_card_is_reissued_once(self):
+        issued = make_cards(4)
+        self.assertEqual(list(expire_cards(chunk_size=2)), [(2, 2), (2, 2)])
+        self.assertEqual(list(expire_cards(chunk_size=2)), [])
+        self.assertEqual([self.replacements(card).count() for card in issued], [1] * 4)
+
+    def test_cards_not_yet_due_or_inactive_are_left_alone(self):
+        current = make_cards(1, days_past_expiry=0)
+        deactivated = make_cards(1, first=1)
+        Card.objects.filter(pk=deactivated[0].pk).update(card_Status='deactivated')
+        self.assertEqual(list(expire_cards()), [])
+        self.assertEqual(self.statuses(current + deactivated), ['active', 'deactivated'])
+
+    def test_cards_changed_after_the_read_are_skipped(self):
+        issued = make_cards(4)
+        # Between the read and the update one card is deactivated and another is
+        # expired and reissued by an overlapping run
+        other_run = [False]
+
+        def change():
+            if not other_run[0]:
+                other_run[0] = True
+                Card.objects.filter(pk=issued[0].pk).update(card_Status='deactivated')
+                Card.objects.filter(pk=issued[1].pk).update(card_Status='expired')
+                Card(user_id=issued[1].user_id).save()
+
+        with before_each_chunk(change):
+            self.assertEqual(list(expire_cards()), [(2, 2)])
+        self.assertEqual(self.statuses(issued), ['deactivated', 'expired', 'expired', 'expired'])
+        self.assertEqual([self.replacements(card).count() for card in issued], [0, 1, 1, 1])
+
+    def test_without_reissue_cards_are_only_expired(self):
+        issued = make_cards(2)
+        self.assertEqual(list(expire_cards(reissue=False)), [(2, 0)])
+        self.assertEqual([self.replacements(card).count() for card in issued], [0, 0])
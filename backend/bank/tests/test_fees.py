@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank import fees
+from bank.fees import calculate_fee, fee_table
+from bank.models import FeeSchedule, FeeTier
+
+from .test_transfers import make_user
+
+
+def schedule(transaction_type, segment='', tiers=()):
+    fee_schedule = FeeSchedule.objects.create(name=f'{transaction_type} {segment}', transaction_type=transaction_type,
+                                              segment=segment)
+    for min_amount, rate, flat_fee, max_fee in tiers:
+        FeeTier.objects.create(schedule=fee_schedule, min_amount=Decimal(min_amount), rate=Decimal(rate),
+                               flat_fee=Decimal(flat_fee), max_fee=Decimal(max_fee) if max_fee else None)
+    return fee_schedule
+
+
+def stale_table():
+    """Make the next fee_table() call check the database version."""
+    fees._checked_at = 0.0
+
+
+class FeeTableTests(TestCase):
+    def setUp(self):
+        fees._table = None
+        self.addCleanup(setattr, fees, '_table', None)
+        self.transfers = schedule('transfer', tiers=[
+            ('10.00', '0.0100', '0.00', None),
+            ('100.00', '0.0050', '1.00', '5.00'),
+        ])
+
+    def test_tier_boundaries(self):
+        quotes = [calculate_fee(Decimal(amount)) for amount in ('9.99', '10.00', '99.99', '100.00', '200.00')]
+        self.assertEqual(quotes, [Decimal(fee) for fee in ('0.00', '0.10', '1.00', '1.50', '2.00')])
+
+    def test_fees_are_capped_at_the_tier_maximum(self):
+        self.assertEqual(calculate_fee(Decimal('799.99')), Decimal('5.00'))
+        self.assertEqual(calculate_fee(Decimal('100000.00')), Decimal('5.00'))
+
+    def test_segments_fall_back_to_the_shared_schedule(self):
+        schedule('transfer', 'premium', tiers=[('0.00', '0.0000', '0.25', None)])
+        self.assertEqual(calculate_fee(Decimal('50.00'), 'transfer', 'premium'), Decimal('0.25'))
+        self.assertEqual(calculate_fee(Decimal('50.00'), 'transfer', 'student'), Decimal('0.50'))
+        self.assertEqual(fee_table().segmented, {'transfer'})
+
+    def test_types_without_a_schedule_pay_the_default_rate(self):
+        self.assertEqual(calculate_fee(Decimal('50.00'), 'withdrawal'), Decimal('1.00'))
+
+    def test_other_processes_recompile_from_the_database_version(self):
+        table = fee_table()
+        tier = FeeTier.objects.get(schedule=self.transfers, min_amount=Decimal('10.00'))
+        tier.rate = Decimal('0.0200')
+        tier.save()
+        # Another process still holds the table compiled before the change
+        fees._table = table
+        self.assertIs(fee_table(), table)
+        stale_table()
+        self.assertEqual(calculate_fee(Decimal('50.00')), Decimal('1.00'))
+
+        table = fee_table()
+        tier.delete()
+        fees._table = table
+        stale_table()
+        self.assertEqual(calculate_fee(Decimal('50.00')), Decimal('0.00'))
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False, FEE_PREVIEW_MAX_AMOUNTS=3)
+class FeePreviewTests(TestCase):
+    def setUp(self):
+        fees._table = None
+        self.addCleanup(setattr, fees, '_table', None)
+        schedule('transfer', tiers=[('0.00', '0.0100', '0.00', '2.00')])
+        schedule('transfer', 'premium', tiers=[('0.00', '0.0000', '0.00', None)])
+        self.user, _ = make_user('0700000090')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def preview(self, amounts, transaction_type='transfer'):
+        return self.client.post('/api/fees/preview/', {'transaction_type': transaction_type, 'amounts': amounts},
+                                format='json')
+
+    def test_quotes_each_amount(self):
+        response = self.preview(['50', 500.5])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['quotes'], [
+            {'amount': '50.00', 'fee': '0.50', 'total': '50.50'},
+            {'amount': '500.50', 'fee': '2.00', 'total': '502.50'},
+        ])
+
+    def test_quotes_use_the_users_segment(self):
+        self.user.segment = 'premium'
+        self.user.save()
+        response = self.preview(['50'])
+        self.assertEqual(response.data['quotes'][0]['fee'], '0.00')
+
+    def test_rejects_invalid_requests(self):
+        self.assertEqual(self.preview(['1', '2', '3', '4']).status_code, 400)
+        self.assertEqual(self.preview(['-1']).status_code, 400)
+        self.assertEqual(self.preview(['NaN']).status_code, 400)
+        self.assertEqual(self.preview([]).status_code, 400)
+        self.assertEqual(self.preview(['1'], 'deposit').status_code, 400)
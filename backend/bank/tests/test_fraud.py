@@ -0,0 +1,73 @@
+import random
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from bank import fraud
+from bank.models import Transaction
+
+from .test_transfers import make_user
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class BatchFeatureTests(SimpleTestCase):
+    def history(self):
+        rng = random.Random(7)
+        rows = []
+        for user in ('u1', 'u2', 'u3'):
+            when = 1_700_000_000.0
+            for _ in range(300):
+                when += rng.choice([5, 60, 400, 700, 3000, 40000])
+                rows.append((user, rng.randrange(8), float(rng.randrange(5, 500)), when))
+        return rows
+
+    def replay(self, rows):
+        """What the live scorer sees for each row, recording transfers as they commit."""
+        states = {}
+        features = []
+        for user, recipient, amount, when in rows:
+            state = states.setdefault(user, fraud.FeatureState())
+            features.append(state.features(amount, recipient, when))
+            with mock.patch('time.time', return_value=when):
+                state.record(amount, recipient, when)
+        return features
+
+    @mock.patch.object(fraud, 'MAX_RECIPIENTS', 4)
+    def test_offline_features_match_the_live_ones(self):
+        if np is None:
+            self.skipTest("NumPy is not installed")
+        rows = self.history()
+        users, recipients, amounts, times = (np.array(column) for column in zip(*rows))
+        offline = fraud.batch_features(users, recipients.astype(np.int64), amounts, times)
+        for index, live in enumerate(self.replay(rows)):
+            for name, value in live.items():
+                with self.subTest(row=index, feature=name):
+                    self.assertAlmostEqual(float(offline[name][index]), float(value), places=6)
+
+
+@override_settings(FRAUD_SCORING_ENABLED=True, FRAUD_BLOCK_SCORE=0, DAILY_TRANSFER_LIMIT='')
+class FraudModeTests(TestCase):
+    def setUp(self):
+        _, self.sender = make_user('0700000060', Decimal('1000.00'))
+        _, self.recipient = make_user('0700000061')
+
+    def transfer(self):
+        Transaction(account=self.sender, to_account=self.recipient, amount=Decimal('10.00'),
+                    transaction_type='transfer').save()
+
+    @override_settings(FRAUD_SCORING_MODE='log')
+    def test_log_mode_lets_the_transfer_through(self):
+        with self.assertLogs('bank.fraud', 'WARNING'):
+            self.transfer()
+        self.assertTrue(Transaction.objects.filter(account=self.recipient).exists())
+
+    @override_settings(FRAUD_SCORING_MODE='block')
+    def test_block_mode_declines(self):
+        with self.assertRaisesMessage(ValidationError, "Transfer declined by risk checks."):
+            self.transfer()
@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.models import IdempotencyKey, Transaction
+
+from .test_transfers import make_user
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False, FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.user, self.account = make_user('0700000100', Decimal('100.00'))
+        _, self.other = make_user('0700000101')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def transfer(self, amount, key='transfer-1'):
+        return self.client.post('/api/transactions/', {
+            'from_account': self.account.accountNumber, 'to_account': self.other.accountNumber, 'amount': amount,
+        }, format='json', headers={'Idempotency-Key': key})
+
+    def transfers(self):
+        return Transaction.objects.filter(account=self.account, transaction_type='transfer').count()
+
+    def test_a_retry_replays_the_stored_response(self):
+        first = self.transfer('10.00')
+        retry = self.transfer('10.00')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first.headers)
+        self.assertEqual(self.transfers(), 1)
+
+    def test_a_different_request_under_the_same_key_is_refused(self):
+        self.transfer('10.00')
+        response = self.transfer('20.00')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.transfers(), 1)
+
+    def test_failed_requests_are_not_stored(self):
+        failed = self.transfer('500.00')
+        self.assertEqual(failed.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        Transaction(account=self.account, amount=Decimal('500.00'), transaction_type='deposit').save()
+        retry = self.transfer('500.00')
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', retry.headers)
+        self.assertEqual(self.transfers(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.transfer('10.00')
+        other_user, other_account = make_user('0700000102', Decimal('50.00'))
+        self.client.force_authenticate(other_user)
+        response = self.client.post('/api/transactions/', {
+            'from_account': other_account.accountNumber, 'to_account': self.other.accountNumber, 'amount': '10.00',
+        }, format='json', headers={'Idempotency-Key': 'transfer-1'})
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response.headers)
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+    def test_requests_without_a_key_are_not_deduplicated(self):
+        for _ in range(2):
+            self.client.post('/api/transactions/', {
+                'from_account': self.account.accountNumber, 'to_account': self.other.accountNumber, 'amount': '10.00',
+            }, format='json')
+        self.assertEqual(self.transfers(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
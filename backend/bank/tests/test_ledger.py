@@ -0,0 +1,69 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F, Sum
+from django.test import TestCase, override_settings
+
+from bank.ledger import reconcile, system_balance
+from bank.models import Account, Posting, Transaction
+
+from .test_transfers import make_user
+
+
+@override_settings(FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class LedgerTests(TestCase):
+    def setUp(self):
+        _, self.sender = make_user('0700000110', Decimal('500.00'))
+        _, self.receiver = make_user('0700000111')
+
+    def post(self, **kwargs):
+        txn = Transaction(account=Account.objects.get(pk=self.sender.pk), **kwargs)
+        txn.save()
+        return txn
+
+    def entry_postings(self, txn):
+        return {
+            (posting.account_id, posting.system_account): posting.amount
+            for posting in Posting.objects.filter(entry__transaction=txn)
+        }
+
+    def test_a_transfer_posts_a_balanced_entry_with_its_fee(self):
+        txn = self.post(to_account=self.receiver, amount=Decimal('100.00'), transaction_type='transfer')
+        self.assertEqual(txn.fee, Decimal('2.00'))
+        postings = self.entry_postings(txn)
+        self.assertEqual(postings, {
+            (self.sender.pk, ''): Decimal('-102.00'),
+            (self.receiver.pk, ''): Decimal('100.00'),
+            (None, 'fee_income'): Decimal('2.00'),
+        })
+        self.assertEqual(sum(postings.values()), 0)
+        self.assertEqual(system_balance('fee_income'), Decimal('2.00'))
+
+    def test_a_withdrawal_pays_out_cash_and_books_the_fee(self):
+        txn = self.post(amount=Decimal('50.00'), transaction_type='withdrawal')
+        postings = self.entry_postings(txn)
+        self.assertEqual(postings[(None, 'cash')], Decimal('50.00'))
+        self.assertEqual(postings[(None, 'fee_income')], Decimal('1.00'))
+        self.assertEqual(sum(postings.values()), 0)
+
+    def test_the_journal_reconciles_with_account_balances(self):
+        self.post(to_account=self.receiver, amount=Decimal('100.00'), transaction_type='transfer')
+        self.post(amount=Decimal('50.00'), transaction_type='withdrawal')
+        totals, mismatched = reconcile()
+        self.assertEqual((totals['total'], totals['fee_income'], mismatched), (Decimal('0.00'), Decimal('3.00'), []))
+        self.assertEqual(Posting.objects.aggregate(total=Sum('amount'))['total'], 0)
+        out = StringIO()
+        call_command('reconcile_ledger', stdout=out)
+        self.assertIn('Ledger reconciles.', out.getvalue())
+
+    def test_reconcile_ledger_flags_a_drifted_balance(self):
+        self.post(to_account=self.receiver, amount=Decimal('100.00'), transaction_type='transfer')
+        # A balance changed outside post_transactions, without a journal entry
+        Account.objects.filter(pk=self.receiver.pk).update(balance=F('balance') + Decimal('1.00'))
+        _, mismatched = reconcile()
+        self.assertEqual(mismatched, [(self.receiver.accountNumber, Decimal('101.00'), Decimal('100.00'))])
+        err = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile_ledger', stdout=StringIO(), stderr=err)
+        self.assertIn(f"{self.receiver.accountNumber}: balance 101.00 != ledger 100.00", err.getvalue())
@@ -0,0 +1,104 @@
+import io
+from itertools import count
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank import onboarding
+from bank.models import Account, Card, User
+from bank.onboarding import import_chunk, read_chunks
+
+from .test_transfers import make_user
+
+HEADER = 'phoneNumber,first_name,last_name,password,balance\n'
+
+
+def csv_rows(*phones):
+    return HEADER + ''.join(f'{phone},Ada,Lovelace,pass1234,25.00\n' for phone in phones)
+
+
+def chunk_of(*phones):
+    return next(read_chunks(io.StringIO(csv_rows(*phones)), 100))
+
+
+def fresh_ids():
+    serials = count(1)
+    return lambda: f'{next(serials):011d}'
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportChunkTests(TestCase):
+    def test_colliding_user_ids_are_retried_with_fresh_ones(self):
+        existing, _ = make_user('0700000070')
+        ids = fresh_ids()
+        side_effect = [existing.pk] + [ids() for _ in range(10)]
+        with mock.patch.object(onboarding, 'generate_numeric_id', side_effect=side_effect):
+            created, errors = import_chunk(chunk_of('0700000071', '0700000072'))
+        self.assertEqual((created, errors), (2, []))
+        for phone in ('0700000071', '0700000072'):
+            user = User.objects.get(phoneNumber=phone)
+            self.assertTrue(user.check_password('pass1234'))
+            self.assertEqual(Account.objects.get(user=user).balance, 25)
+            self.assertEqual(Card.objects.filter(user=user).count(), 1)
+
+    def test_a_phone_taken_after_the_check_rejects_only_that_row(self):
+        taken_phones = onboarding.taken_phones
+
+        def taken_after_the_check(phones):
+            # A signup registers the number between the check and the insert
+            if not User.objects.filter(phoneNumber='0700000074').exists():
+                make_user('0700000074')
+                return set()
+            return taken_phones(phones)
+
+        with mock.patch.object(onboarding, 'taken_phones', side_effect=taken_after_the_check):
+            created, errors = import_chunk(chunk_of('0700000073', '0700000074'))
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, [(3, "phoneNumber is already registered.")])
+        self.assertTrue(User.objects.filter(phoneNumber='0700000073').exists())
+
+    def test_rows_still_colliding_are_rejected_instead_of_raising(self):
+        existing, _ = make_user('0700000075')
+        with mock.patch.object(onboarding, 'generate_numeric_id', return_value=existing.pk):
+            created, errors = import_chunk(chunk_of('0700000076'))
+        self.assertEqual((created, errors), (0, [(2, "Could not be imported; try again.")]))
+        self.assertFalse(User.objects.filter(phoneNumber='0700000076').exists())
+
+
+@override_settings(
+    BANK_THROTTLE_ENABLED=False, BULK_IMPORT_MAX_ROWS=3,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class BulkUserImportViewTests(TestCase):
+    def setUp(self):
+        admin, _ = make_user('0700000077')
+        admin.is_staff = True
+        admin.save()
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def upload(self, content):
+        upload = SimpleUploadedFile('users.csv', content, content_type='text/csv')
+        return self.client.post('/api/admin/import-users/', {'file': upload}, format='multipart')
+
+    def test_imports_an_upload_within_the_limit(self):
+        response = self.upload(csv_rows('0700000078', '0700000079', '0700000077').encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['imported'], response.data['rejected']), (2, 1))
+        self.assertTrue(User.objects.get(phoneNumber='0700000079').check_password('pass1234'))
+
+    def test_larger_uploads_are_refused_before_importing_anything(self):
+        phones = [f'07100000{n:02d}' for n in range(4)]
+        response = self.upload(csv_rows(*phones).encode())
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['imported'], 0)
+        self.assertIn('import_users', response.data['detail'])
+        self.assertFalse(User.objects.filter(phoneNumber__in=phones).exists())
+
+    def test_undecodable_uploads_import_nothing(self):
+        response = self.upload(csv_rows('0700000080').encode() + b'0700000081,\xff\xfe,Lovelace,pass1234,\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['imported'], 0)
+        self.assertFalse(User.objects.filter(phoneNumber='0700000080').exists())
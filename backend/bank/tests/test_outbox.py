@@ -0,0 +1,71 @@
+import json
+from datetime import timedelta
+from http.client import IncompleteRead
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bank import outbox
+from bank.models import OutboxEvent
+from bank.outbox import claim, deliver
+
+
+def make_events(count):
+    OutboxEvent.objects.all().delete()
+    return [OutboxEvent.objects.create(topic='test', payload={'n': n}) for n in range(count)]
+
+
+class ClaimTests(TestCase):
+    def test_parallel_claimers_get_disjoint_batches(self):
+        events = make_events(5)
+        first = claim('worker-a', 3, 60)
+        second = claim('worker-b', 3, 60)
+        self.assertEqual([event.pk for event in first], [event.pk for event in events[:3]])
+        self.assertEqual([event.pk for event in second], [event.pk for event in events[3:]])
+        self.assertNotEqual(first[0].lease_owner, second[0].lease_owner)
+        self.assertEqual(claim('worker-c', 3, 60), [])
+
+    def test_lapsed_leases_are_claimed_again(self):
+        make_events(2)
+        first = claim('worker-a', 2, 60)
+        OutboxEvent.objects.filter(pk=first[0].pk).update(leased_until=timezone.now() - timedelta(seconds=1))
+        again = claim('worker-b', 2, 60)
+        self.assertEqual([event.pk for event in again], [first[0].pk])
+        self.assertTrue(again[0].lease_owner.startswith('worker-b:'))
+
+
+@override_settings(OUTBOX_WEBHOOK_URLS=['http://hooks.example/events'], OUTBOX_WEBHOOK_SECRET='s3cret',
+                   OUTBOX_MAX_ATTEMPTS=2)
+class DeliverTests(TestCase):
+    def make_due(self):
+        OutboxEvent.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+
+    def test_delivered_events_are_signed_and_deleted(self):
+        make_events(2)
+        with mock.patch.object(outbox, 'urlopen') as urlopen:
+            self.assertEqual(deliver(claim('worker', 10, 60)), (2, 0))
+        request = urlopen.call_args.args[0]
+        self.assertEqual([event['payload'] for event in json.loads(request.data)['events']], [{'n': 0}, {'n': 1}])
+        signature = request.get_header(outbox.SIGNATURE_HEADER.capitalize())
+        self.assertEqual(signature, f"sha256={outbox.sign(request.data)}")
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_failures_back_off_and_end_up_dead(self):
+        make_events(2)
+        started = timezone.now()
+        with mock.patch.object(outbox, 'urlopen', side_effect=IncompleteRead(b'')):
+            self.assertEqual(deliver(claim('worker', 10, 60)), (0, 2))
+            for event in OutboxEvent.objects.all():
+                self.assertEqual((event.status, event.attempts, event.lease_owner), ('pending', 1, ''))
+                self.assertIsNone(event.leased_until)
+                self.assertGreaterEqual(event.available_at, started + timedelta(seconds=2))
+                self.assertIn('IncompleteRead', event.last_error)
+            # Not due again until the backoff has passed
+            self.assertEqual(claim('worker', 10, 60), [])
+
+            self.make_due()
+            self.assertEqual(deliver(claim('worker', 10, 60)), (0, 2))
+        self.assertEqual(set(OutboxEvent.objects.values_list('status', 'attempts')), {('dead', 2)})
+        self.make_due()
+        self.assertEqual(claim('worker', 10, 60), [])
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.api.views import get_tokens_for_user
+from bank.authentication import revocations
+from bank.models import Card, Transaction
+
+from .test_transfers import make_user
+
+# Queries each read endpoint runs for one request with a cold cache, including the
+# token-state lookup of a real bearer token. The counts must not depend on how many
+# rows the user has, so the user is seeded with enough history and cards for a
+# regression to per-row lookups (N+1) to show up.
+QUERY_BUDGETS = {
+    '/api/balance/': 2,
+    '/api/getmyprofile/': 2,
+    '/api/mycards/': 2,
+    '/api/gettransactions/': 3,
+    '/api/transactions/export/': 3,
+    '/api/statements/': 4,
+    '/api/analytics/': 4,
+}
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False, FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, account = make_user('0700000040', Decimal('100000.00'))
+        _, other = make_user('0700000041', Decimal('100000.00'))
+        for _ in range(15):
+            Transaction(account=account, to_account=other, amount=Decimal('10.00'), transaction_type='transfer').save()
+            Transaction(account=other, to_account=account, amount=Decimal('7.00'), transaction_type='transfer').save()
+        for _ in range(5):
+            Card(user=cls.user).save()
+
+    def test_read_endpoints_stay_within_their_query_budgets(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.user)['access']}")
+        for path, budget in QUERY_BUDGETS.items():
+            # A cache of its own per endpoint, so each request takes the cache-miss path
+            # for both the response and the token state
+            caches = {**settings.CACHES, 'query-budget': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'query-budget{path}',
+            }}
+            revocations._entries.clear()
+            with self.subTest(path), override_settings(CACHES=caches, BANK_CACHE_ALIAS='query-budget'):
+                with self.assertNumQueries(budget):
+                    response = client.get(path)
+                    # Streaming responses only query the database while they are consumed
+                    if getattr(response, 'streaming', False):
+                        b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.api import serializers
+from bank.models import Account, OutboxEvent, User, generate_Account_number
+from bank.numbering import account_numbers
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False)
+class RegistrationTests(TransactionTestCase):
+    def register(self, phone):
+        return APIClient().post('/api/signup/', {
+            'phoneNumber': phone, 'first_name': 'Ada', 'last_name': 'Lovelace',
+            'email': 'ADA@Example.COM', 'address': '1 Main St', 'password': 'pass1234',
+        }, format='json')
+
+    def test_hashing_and_numbering_run_outside_the_transaction(self):
+        in_transaction = []
+
+        def record(call):
+            def wrapper(*args, **kwargs):
+                in_transaction.append(connection.in_atomic_block)
+                return call(*args, **kwargs)
+            return wrapper
+
+        allocate = account_numbers.allocate
+        with mock.patch.object(serializers, 'make_password', record(make_password)), \
+                mock.patch.object(account_numbers, 'allocate', record(allocate)):
+            response = self.register('0700000050')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(in_transaction, [False, False])
+
+    def test_user_account_and_event_are_created_together(self):
+        self.register('0700000051')
+        user = User.objects.get(username='0700000051')
+        self.assertTrue(user.check_password('pass1234'))
+        self.assertEqual(user.email, 'ADA@example.com')
+        self.assertEqual(Account.objects.filter(user=user).count(), 1)
+        self.assertTrue(OutboxEvent.objects.filter(payload__id=user.pk).exists())
+
+    def test_the_account_gets_the_number_reserved_before_the_transaction(self):
+        with mock.patch.object(account_numbers, 'allocate', return_value=777):
+            self.register('0700000052')
+        accounts = Account.objects.filter(user__username='0700000052')
+        self.assertEqual(list(accounts.values_list('accountNumber', flat=True)), [generate_Account_number(777)])
+
+    def test_users_created_elsewhere_still_get_one_account(self):
+        user = User.objects.create_user(username='0700000053', phoneNumber='0700000053', password='pass1234')
+        self.assertEqual(Account.objects.filter(user=user).count(), 1)
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bank.models import Account, DailyBalance, DailyBalanceShard, MonthlyRollup, Transaction
+from bank.snapshots import build_statement, rebuild_daily_balances
+from bank.upserts import add_or_insert
+
+from .test_transfers import make_user
+
+
+def snapshot_rows(account):
+    return list(
+        DailyBalance.objects.filter(account=account).order_by('date')
+        .values_list('date', 'closing_balance', 'total_in', 'total_out', 'total_fees', 'transaction_count')
+    )
+
+
+class UpsertTests(TestCase):
+    def test_adds_to_an_existing_row_instead_of_inserting_it_again(self):
+        _, account = make_user('0700000020')
+        key = {'account_id': account.pk, 'date': timezone.localdate()}
+        DailyBalance.objects.filter(**key).delete()
+        add_or_insert(DailyBalance, key, {'closing_balance': Decimal('5.00'), 'transaction_count': 1},
+                      initial={'closing_balance': Decimal('50.00')})
+        add_or_insert(DailyBalance, key, {'closing_balance': Decimal('-2.50'), 'transaction_count': 2},
+                      initial={'closing_balance': Decimal('99.00')})
+        row = DailyBalance.objects.get(**key)
+        self.assertEqual((row.closing_balance, row.transaction_count), (Decimal('47.50'), 3))
+
+    def test_monthly_rollups_fold_into_one_row_per_key(self):
+        _, account = make_user('0700000021')
+        for amount in ('10.00', '15.00'):
+            Transaction(account=account, amount=Decimal(amount), transaction_type='deposit').save()
+        rollup = MonthlyRollup.objects.get(account=account, transaction_type='deposit')
+        self.assertEqual((rollup.amount, rollup.transaction_count), (Decimal('25.00'), 2))
+
+
+@override_settings(FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class ShardedSnapshotTests(TestCase):
+    def setUp(self):
+        _, self.sender = make_user('0700000022', Decimal('1000.00'))
+        _, self.account = make_user('0700000023', Decimal('100.00'))
+        call_command('set_balance_shards', self.account.accountNumber, 4, stdout=StringIO())
+        self.account.refresh_from_db()
+
+    def transfer(self, amount, date=None):
+        txn = Transaction(
+            account=self.sender, to_account=self.account, amount=Decimal(amount), transaction_type='transfer',
+        )
+        if date:
+            txn.date = date
+        txn.save()
+
+    def test_credits_go_to_shard_rows_and_fold_on_compaction(self):
+        before = snapshot_rows(self.account)
+        self.transfer('10.00', timezone.now() - timedelta(days=2))
+        self.transfer('20.00')
+        self.transfer('30.00')
+        self.assertEqual(snapshot_rows(self.account), before)
+        self.assertTrue(DailyBalanceShard.objects.filter(account=self.account).exists())
+
+        account = Account.objects.get(pk=self.account.pk)
+        account.compact_shards()
+        self.assertFalse(DailyBalanceShard.objects.filter(account=self.account).exists())
+        folded = snapshot_rows(self.account)
+        rebuild_daily_balances([self.account.pk])
+        self.assertEqual(folded, snapshot_rows(self.account))
+
+    def test_debits_compact_first_and_match_a_rebuild(self):
+        self.transfer('20.00', timezone.now() - timedelta(days=1))
+        self.transfer('30.00')
+        Transaction(account=Account.objects.get(pk=self.account.pk), amount=Decimal('40.00'),
+                    transaction_type='withdrawal').save()
+        self.transfer('5.00')
+        account = Account.objects.get(pk=self.account.pk)
+        account.compact_shards()
+        folded = snapshot_rows(self.account)
+        rebuild_daily_balances([self.account.pk])
+        self.assertEqual(folded, snapshot_rows(self.account))
+        self.assertEqual(folded[-1][1], account.total_balance())
+
+    def test_statements_count_credits_not_folded_yet(self):
+        today = timezone.localdate()
+        self.transfer('10.00', timezone.now() - timedelta(days=3))
+        self.transfer('20.00')
+        unfolded = build_statement(self.account, today - timedelta(days=1), today)
+        Account.objects.get(pk=self.account.pk).compact_shards()
+        self.assertEqual(unfolded, build_statement(self.account, today - timedelta(days=1), today))
+        self.assertEqual(unfolded['opening_balance'], '10.00')
+        self.assertEqual(unfolded['closing_balance'], '130.00')
@@ -0,0 +1,23 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.models import User
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False)
+class StatementViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='0700000010', phoneNumber='0700000010', password='pass1234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unparseable_dates_are_a_field_error(self):
+        for params in ({'date_from': 'xyz'}, {'date_to': '2024-02-30'}):
+            response = self.client.get('/api/statements/', params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(list(response.data), list(params))
+
+    def test_missing_dates_default_to_this_month(self):
+        response = self.client.get('/api/statements/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['date_from'].endswith('-01'))
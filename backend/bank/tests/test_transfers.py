@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from bank.models import Account, Transaction, User
+
+
+def make_user(phone, balance=Decimal('0.00')):
+    user = User.objects.create_user(username=phone, phoneNumber=phone, password='pass1234')
+    account = Account.objects.get(user=user)
+    if balance:
+        Transaction(account=account, amount=balance, transaction_type='deposit').save()
+        account.refresh_from_db()
+    return user, account
+
+
+@override_settings(BANK_THROTTLE_ENABLED=False, FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class BatchTransferValidationTests(TestCase):
+    def setUp(self):
+        self.user, self.account = make_user('0700000001', Decimal('1000.00'))
+        _, self.other = make_user('0700000002')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, items):
+        return self.client.post('/api/transactions/batch/', items, format='json')
+
+    def test_non_finite_amounts_are_rejected_per_item(self):
+        response = self.post([
+            {'from_account': self.account.accountNumber, 'to_account': self.other.accountNumber, 'amount': amount}
+            for amount in ['NaN', 'Infinity', '-Infinity', '10.00']
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['accepted'], 1)
+        self.assertEqual(
+            [result['error'] for result in response.data['results'][:3]],
+            ["A valid amount is required."] * 3,
+        )
+
+    def test_transfer_to_the_same_account_is_rejected(self):
+        response = self.post([
+            {'from_account': self.account.accountNumber, 'to_account': self.account.accountNumber, 'amount': '10.00'},
+        ])
+        self.assertEqual(response.data['results'][0]['error'], "Cannot transfer to the same account.")
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1000.00'))
+
+
+@override_settings(FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='')
+class TransferTests(TestCase):
+    def test_transfer_to_the_same_account_is_rejected(self):
+        _, account = make_user('0700000003', Decimal('100.00'))
+        with self.assertRaisesMessage(ValidationError, "Cannot transfer to the same account."):
+            Transaction(account=account, to_account=account, amount=Decimal('10.00'), transaction_type='transfer').save()
+
+
+@override_settings(FRAUD_SCORING_ENABLED=False, DAILY_TRANSFER_LIMIT='100.00')
+class DailyTransferLimitTests(TestCase):
+    def setUp(self):
+        self.user, self.account = make_user('0700000004', Decimal('1000.00'))
+        _, self.other = make_user('0700000005')
+
+    def transfer(self, amount):
+        Transaction(account=self.account, to_account=self.other, amount=Decimal(amount), transaction_type='transfer').save()
+
+    def test_withdrawals_neither_count_nor_are_capped(self):
+        Transaction(account=self.account, amount=Decimal('150.00'), transaction_type='withdrawal').save()
+        self.transfer('100.00')
+        with self.assertRaisesMessage(ValidationError, "Daily transfer limit exceeded."):
+            self.transfer('5.00')
+
+    @override_settings(BANK_THROTTLE_ENABLED=False)
+    def test_batches_count_against_the_same_limit(self):
+        self.transfer('60.00')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/transactions/batch/', [
+            {'from_account': self.account.accountNumber, 'to_account': self.other.accountNumber, 'amount': amount}
+            for amount in ['30.00', '20.00', '10.00']
+        ], format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], ['ok', 'rejected', 'ok'])
+
+    @override_settings(DAILY_TRANSFER_LIMIT='')
+    def test_an_empty_limit_is_off(self):
+        self.transfer('500.00')
+        self.transfer('400.00')
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Token bucket throttles. A bucket holds up to `num` tokens and refills at
+# `num` per period, so a "60/min" rate allows bursts of 60 and then one request
+# a second. Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'60/min' -> (capacity 60, refill 1.0 token per second)."""
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """Buckets in this process's memory, least recently used dropped past ``max_size``."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def consume(self, key, capacity, refill, now):
+        """Take a token; return 0 if one was available, else the seconds until one is."""
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+            return wait
+
+    async def aconsume(self, key, capacity, refill, now):
+        return self.consume(key, capacity, refill, now)
+
+
+class CacheBucketStore:
+    """
+    Buckets in a shared Django cache, so every worker enforces the same limits.
+    The read-modify-write isn't atomic: concurrent requests for one key can both
+    take the last token, which slightly loosens the limit under contention.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def consume(self, key, capacity, refill, now):
+        cache = caches[self.alias]
+        tokens, wait, timeout = self._take(cache.get(key), capacity, refill, now)
+        cache.set(key, (tokens, now), timeout)
+        return wait
+
+    async def aconsume(self, key, capacity, refill, now):
+        cache = caches[self.alias]
+        tokens, wait, timeout = self._take(await cache.aget(key), capacity, refill, now)
+        await cache.aset(key, (tokens, now), timeout)
+        return wait
+
+    @staticmethod
+    def _take(bucket, capacity, refill, now):
+        tokens, updated = bucket or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / refill
+        # Kept until the bucket would be full again
+        return tokens, wait, int((capacity - tokens) / refill) + 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                alias = settings.BANK_THROTTLE_CACHE_ALIAS
+                _store = CacheBucketStore(alias) if alias else LocalBucketStore(settings.BANK_THROTTLE_LOCAL_SIZE)
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    # How clients are told apart: 'user' (falling back to the IP) or 'ip'
+    key_by = 'user'
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_cache_key(self, request, view, scope):
+        if self.key_by == 'user' and request.user and request.user.is_authenticated:
+            return f"bank:throttle:{scope}:user:{request.user.pk}"
+        return f"bank:throttle:{scope}:ip:{self.get_ident(request)}"
+
+    def get_bucket(self, request, view):
+        """(key, capacity, refill) of the bucket the request draws from, or None if it isn't throttled."""
+        if not settings.BANK_THROTTLE_ENABLED:
+            return None
+        scope = self.get_scope(view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+        if rate is None:
+            return None
+        return (self.get_cache_key(request, view, scope), *parse_rate(rate))
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        self.wait_time = get_store().consume(*bucket, time.time()) or None
+        return self.wait_time is None
+
+    async def aallow_request(self, request, view):
+        """Async allow_request(), for the async views."""
+        self.wait_time = None
+        bucket = self.get_bucket(request, view)
+        if bucket is None:
+            return True
+        self.wait_time = await get_store().aconsume(*bucket, time.time()) or None
+        return self.wait_time is None
+
+    def wait(self):
+        return self.wait_time
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Overall request rate per user, or per IP for anonymous requests."""
+    scope = 'user'
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Overall request rate per client IP, whoever is logged in."""
+    scope = 'ip'
+    key_by = 'ip'
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """Per-endpoint rate for views that set ``throttle_scope``, per user or IP."""
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None)
@@ -0,0 +1,242 @@
+from decimal import Decimal
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .fees import calculate_fee, fee_segment
+from .fraud import check_transfer
+from .models import Account, DailyBalance, Transaction
+from .signals import transactions_posted
+
+MINIMUM_AMOUNT = Decimal('5.00')
+CENTS = Decimal('0.01')
+
+
+def daily_limit():
+    limit = settings.DAILY_TRANSFER_LIMIT
+    return Decimal(str(limit)) if limit else None
+
+
+def sent_today(user_id):
+    """
+    Money transferred from the user's accounts today, read from the daily snapshots
+    that posting keeps up to date instead of summing their transactions.
+    """
+    total = DailyBalance.objects.filter(
+        account__user_id=user_id, date=timezone.localdate()
+    ).aggregate(total=Sum('total_sent'))['total']
+    return total or Decimal('0.00')
+
+
+def check_daily_limit(user_id, amount, already_sent=None):
+    """Refuse ``amount`` if it would take the user past DAILY_TRANSFER_LIMIT; call with the sender locked."""
+    limit = daily_limit()
+    if limit is None:
+        return
+    if already_sent is None:
+        already_sent = sent_today(user_id)
+    if already_sent + amount > limit:
+        raise ValidationError("Daily transfer limit exceeded.")
+
+
+def lock_accounts(*account_ids):
+    """Lock the given accounts in primary key order so concurrent transfers can't deadlock."""
+    accounts = Account.objects.select_for_update().filter(pk__in=set(account_ids)).order_by('pk')
+    return {account.pk: account for account in accounts}
+
+
+def post_transactions(rows, accounts, batch_size=None):
+    """Insert ledger rows and notify ``transactions_posted`` receivers; call inside transaction.atomic."""
+    Transaction.objects.bulk_create(rows, batch_size=batch_size)
+    transactions_posted.send(
+        sender=Transaction,
+        transactions=rows,
+        # Sharded accounts' rows don't hold their full balance, so they're left out
+        balances={account.pk: account.balance for account in accounts if not account.balance_shards},
+        sharded={account.pk: account.balance_shards for account in accounts if account.balance_shards},
+    )
+
+
+def execute_withdrawal(txn):
+    if not txn.account_id:
+        raise ValidationError("Withdrawal must have a source account.")
+    if txn.amount < MINIMUM_AMOUNT:
+        raise ValidationError("Minimum withdrawal amount is 5.")
+
+    with transaction.atomic():
+        account = lock_accounts(txn.account_id)[txn.account_id]
+        txn.fee = calculate_fee(txn.amount, 'withdrawal', fee_segment(account.user_id, 'withdrawal'))
+        total_deduction = txn.amount + txn.fee
+        if total_deduction > account.total_balance():
+            raise ValidationError("Insufficient funds for withdrawal.")
+
+        # Deduct the total (amount + fee) from the source account balance
+        account.adjust_balance(-total_deduction)
+        txn.account = account
+        txn.user_id = account.user_id
+        post_transactions([txn], [account])
+    return txn
+
+
+def execute_deposit(txn):
+    if not txn.account_id:
+        raise ValidationError("Deposit must have a destination account.")
+    if txn.amount <= Decimal('0.00'):
+        raise ValidationError("Deposit amount must be positive.")
+
+    with transaction.atomic():
+        account = lock_accounts(txn.account_id)[txn.account_id]
+        account.adjust_balance(txn.amount)
+        txn.account = account
+        txn.user_id = account.user_id
+        post_transactions([txn], [account])
+    return txn
+
+
+def execute_transfer(txn):
+    """
+    Move funds between two accounts and write both ledger rows in one database transaction.
+
+    Both accounts are locked before their balances are read, the debit is a single
+    conditional UPDATE that refuses to overdraw, and the 'transfer' and complementary
+    'received' rows go out in one bulk insert.
+    """
+    if not txn.account_id or not txn.to_account_id:
+        raise ValidationError("Transfer must specify both from and to accounts.")
+    if txn.account_id == txn.to_account_id:
+        raise ValidationError("Cannot transfer to the same account.")
+    if txn.amount < MINIMUM_AMOUNT:
+        raise ValidationError("Minimum transfer amount is 5.")
+
+    with transaction.atomic():
+        # Sharded recipients are credited through their shard rows and need no lock
+        if txn.to_account.balance_shards:
+            accounts = lock_accounts(txn.account_id)
+        else:
+            accounts = lock_accounts(txn.account_id, txn.to_account_id)
+        sender = accounts[txn.account_id]
+        recipient = accounts.get(txn.to_account_id, txn.to_account)
+        check_daily_limit(sender.user_id, txn.amount)
+        check_transfer(sender.user_id, txn.amount, recipient.pk)
+
+        txn.fee = calculate_fee(txn.amount, 'transfer', fee_segment(sender.user_id, 'transfer'))
+        total_deduction = txn.amount + txn.fee
+        if total_deduction > sender.total_balance():
+            raise ValidationError("Insufficient funds for transfer.")
+
+        # Deduct from sender and add to recipient
+        sender.adjust_balance(-total_deduction)
+        recipient.adjust_balance(txn.amount)
+
+        txn.account = sender
+        txn.to_account = recipient
+        txn.user_id = sender.user_id
+
+        # Complementary "received" transaction for the recipient
+        received = Transaction(
+            account=recipient,
+            from_account=sender,
+            user_id=recipient.user_id,
+            amount=txn.amount,
+            date=txn.date,
+            transaction_type='received',
+        )
+        post_transactions([txn, received], [sender, recipient])
+    return received
+
+
+def execute_batch(user, items, chunk_size=1000):
+    """
+    Apply many transfers from the user's accounts in one database transaction.
+
+    Every account number in the batch is resolved and locked with a single
+    ``accountNumber__in`` query, each account's balance is changed by one
+    aggregated UPDATE, and the ledger rows are bulk inserted in chunks.
+    Returns one result dict per item, in order; items that fail validation
+    are rejected without affecting the rest of the batch.
+    """
+    items = [item if isinstance(item, dict) else {} for item in items]
+    numbers = set()
+    for item in items:
+        numbers.add(str(item.get('from_account')))
+        numbers.add(str(item.get('to_account')))
+
+    results = []
+    rows = []
+    deltas = {}
+    with transaction.atomic():
+        accounts = {
+            account.accountNumber: account
+            for account in Account.objects.select_for_update()
+            .filter(accountNumber__in=numbers)
+            .order_by('pk')
+        }
+        # Balances as they stand after the items accepted so far
+        available = {account.pk: account.total_balance() for account in accounts.values()}
+        # Only the user's own accounts can send, so one daily total covers the batch
+        limit = daily_limit()
+        sent_total = sent_today(user.pk) if limit is not None else None
+        segment = fee_segment(user.pk, 'transfer')
+
+        for index, item in enumerate(items):
+            try:
+                sender, recipient, amount = _validate_batch_item(user, item, accounts)
+                fee = calculate_fee(amount, 'transfer', segment)
+                total_deduction = amount + fee
+                if total_deduction > available[sender.pk]:
+                    raise ValidationError("Insufficient funds for transfer.")
+                if limit is not None:
+                    check_daily_limit(user.pk, amount, sent_total)
+                # Scored against the features as they were before the batch
+                check_transfer(user.pk, amount, recipient.pk)
+            except ValidationError as exc:
+                results.append({'index': index, 'status': 'rejected', 'error': exc.messages[0]})
+                continue
+
+            if sent_total is not None:
+                sent_total += amount
+            available[sender.pk] -= total_deduction
+            available[recipient.pk] += amount
+            deltas[sender.pk] = deltas.get(sender.pk, Decimal('0.00')) - total_deduction
+            deltas[recipient.pk] = deltas.get(recipient.pk, Decimal('0.00')) + amount
+
+            sent = Transaction(
+                account=sender, to_account=recipient, user_id=sender.user_id,
+                amount=amount, fee=fee, transaction_type='transfer',
+            )
+            rows.append(sent)
+            rows.append(Transaction(
+                account=recipient, from_account=sender, user_id=recipient.user_id,
+                amount=amount, date=sent.date, transaction_type='received',
+            ))
+            results.append({'index': index, 'status': 'ok', 'id': str(sent.id), 'fee': str(fee)})
+
+        by_pk = {account.pk: account for account in accounts.values()}
+        for pk, delta in deltas.items():
+            if delta:
+                by_pk[pk].adjust_balance(delta)
+        post_transactions(rows, [by_pk[pk] for pk in deltas], batch_size=chunk_size)
+    return results
+
+
+def _validate_batch_item(user, item, accounts):
+    sender = accounts.get(str(item.get('from_account')))
+    recipient = accounts.get(str(item.get('to_account')))
+    if sender is None or recipient is None:
+        raise ValidationError("One or both of the provided account numbers are invalid.")
+    if sender.user_id != user.pk:
+        raise ValidationError("You can only transfer from your own accounts.")
+    if sender.pk == recipient.pk:
+        raise ValidationError("Cannot transfer to the same account.")
+    try:
+        amount = Decimal(str(item.get('amount'))).quantize(CENTS)
+        # NaN and Infinity parse but aren't amounts
+        if not amount.is_finite():
+            raise ValidationError("A valid amount is required.")
+    except ArithmeticError:
+        raise ValidationError("A valid amount is required.")
+    if amount < MINIMUM_AMOUNT:
+        raise ValidationError("Minimum transfer amount is 5.")
+    return sender, recipient, amount
@@ -0,0 +1,37 @@
+from django.db import connection
+
+# Counter rows that postings add to (daily snapshots, monthly rollups) are written
+# with one INSERT ... ON CONFLICT DO UPDATE per key. An update-then-create pair
+# lets two transactions that both miss the row race to insert it, and the loser
+# fails on the unique constraint; the upsert leaves that to the database.
+
+
+def add_or_insert(model, key, deltas, initial=None):
+    """
+    Add ``deltas`` ({field: amount}) to the row of ``model`` identified by ``key``
+    ({field: value}, the fields of a unique constraint), inserting the row if it
+    doesn't exist yet. A new row gets the deltas as its values, except for the
+    fields in ``initial``, and field defaults elsewhere.
+    """
+    opts = model._meta
+    quote = connection.ops.quote_name
+    table = quote(opts.db_table)
+    values = {**key, **deltas, **(initial or {})}
+    for field in opts.concrete_fields:
+        if not field.primary_key and field.attname not in values and field.has_default():
+            values[field.attname] = field.get_default()
+    fields = [opts.get_field(name) for name in values]
+    columns = ', '.join(quote(field.column) for field in fields)
+    conflict = ', '.join(quote(opts.get_field(name).column) for name in key)
+    assignments = ', '.join(
+        f'{quote(column)} = {table}.{quote(column)} + %s'
+        for column in (opts.get_field(name).column for name in deltas)
+    )
+    sql = (
+        f'INSERT INTO {table} ({columns}) VALUES ({", ".join(["%s"] * len(fields))}) '
+        f'ON CONFLICT ({conflict}) DO UPDATE SET {assignments}'
+    )
+    params = [field.get_db_prep_save(value, connection) for field, value in zip(fields, values.values())]
+    params += [opts.get_field(name).get_db_prep_save(value, connection) for name, value in deltas.items()]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
@@ -1,18 +1,31 @@
 from django.urls import path
-from .api.views import RegisterView, LoginView, CardView,TransactionListCreateView, BalanceRetrieveUpdateView,GetProfileView , UpdateProfileView, UserTransactionListView
+from .api.async_views import AsyncBalanceView, AsyncCardView, AsyncProfileView, AsyncTransactionHistoryView
+from .api.views import RegisterView, LoginView, BulkUserImportView, CardView,TransactionListCreateView, BatchTransactionView, FeePreviewView, TransactionExportView, BalanceRetrieveUpdateView, StatementView, AnalyticsView, GetProfileView , UpdateProfileView, UserTransactionListView
 
 urlpatterns = [
     path('signup/', RegisterView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
+    path('admin/import-users/', BulkUserImportView.as_view(), name='import-users'),
 
     # Transactions
     path('transactions/', TransactionListCreateView.as_view(), name='transaction-list-create'),  # List and create transactions
+    path('transactions/batch/', BatchTransactionView.as_view(), name='transaction-batch'),
+    path('transactions/export/', TransactionExportView.as_view(), name='transaction-export'),
+    path('fees/preview/', FeePreviewView.as_view(), name='fee-preview'),
 
     # Balance
     path('balance/', BalanceRetrieveUpdateView.as_view(), name='balance-retrieve-update'),  # Retrieve and update balance
+    path('statements/', StatementView.as_view(), name='statements'),
+    path('analytics/', AnalyticsView.as_view(), name='analytics'),
     path('users/<str:pk>/update/', UpdateProfileView.as_view(), name='update-profile'),
     # path('deposit/', DepositSharesView.as_view(), name='deposit-shares'),
     path('gettransactions/', UserTransactionListView.as_view(), name='user-transactions'),
     path('mycards/', CardView.as_view(), name='cardserializer'),
-    path('getmyprofile/', GetProfileView.as_view(), name='getProfile')
+    path('getmyprofile/', GetProfileView.as_view(), name='getProfile'),
+
+    # Async-native read endpoints for ASGI deployments
+    path('async/balance/', AsyncBalanceView.as_view(), name='async-balance'),
+    path('async/getmyprofile/', AsyncProfileView.as_view(), name='async-getProfile'),
+    path('async/mycards/', AsyncCardView.as_view(), name='async-cards'),
+    path('async/gettransactions/', AsyncTransactionHistoryView.as_view(), name='async-user-transactions'),
 ]
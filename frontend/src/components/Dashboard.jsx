@@ -10,6 +10,7 @@ import dayjs from "dayjs";
 import relativeTime from "dayjs/plugin/relativeTime";
 import { Navigate, useNavigate } from "react-router-dom";
 import logo2 from "../assets/logo2.webp";
+import { fetchTransactionsUntil } from "./transactionPages";
 
 dayjs.extend(relativeTime);
 
@@ -50,20 +51,12 @@ function Dashboard() {
     fetchBalance();
   }, []);
 
-  // Fetch transactions
+  // Fetch transactions, following `next` until the three most recent are in
   useEffect(() => {
     const fetchTransactions = async () => {
       try {
-        const token = localStorage.getItem("accessToken");
-        const response = await axios.get(
-          `${backend_url}/api/gettransactions/`,
-          {
-            headers: {
-              Authorization: `Bearer ${token}`,
-            },
-          }
-        );
-        setTransactions(response.data);
+        const { results } = await fetchTransactionsUntil(3);
+        setTransactions(results);
       } catch (error) {
         if (error.response && error.response.status === 401) {
           handleLogout();
@@ -3,6 +3,7 @@ import axios from "axios";
 import logo3 from "../assets/logo3.png";
 import dayjs from "dayjs";
 import relativeTime from "dayjs/plugin/relativeTime";
+import { fetchTransactionsUntil } from "./transactionPages";
 
 dayjs.extend(relativeTime);
 
@@ -55,23 +56,31 @@ function DashboardHome() {
     fetchBalance();
   }, []);
 
+  // Pages are followed until the selected account's three most recent rows are in
   useEffect(() => {
+    if (!selectedAccount) {
+      return;
+    }
+    // A slower fetch for a previously selected account must not overwrite this one
+    let cancelled = false;
     const fetchTransactions = async () => {
       try {
-        const token = localStorage.getItem("accessToken");
-        const response = await axios.get(
-          `${backend_url}/api/gettransactions/`,
-          {
-            headers: { Authorization: `Bearer ${token}` },
-          }
+        const { results } = await fetchTransactionsUntil(
+          3,
+          (transaction) => transaction.account === selectedAccount.id
         );
-        setTransactions(response.data);
+        if (!cancelled) {
+          setTransactions(results);
+        }
       } catch (error) {
         console.error("Error fetching transactions:", error);
       }
     };
     fetchTransactions();
-  }, []);
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedAccount]);
 
   // Filter transactions based on selected account
   useEffect(() => {
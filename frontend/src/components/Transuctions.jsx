@@ -3,6 +3,7 @@ import React, { useEffect, useState } from "react";
 import axios from "axios";
 import dayjs from "dayjs";
 import relativeTime from "dayjs/plugin/relativeTime";
+import { fetchTransactionPage } from "./transactionPages";
 
 dayjs.extend(relativeTime);
 
@@ -10,6 +11,8 @@ const backend_url = import.meta.env.VITE_APP_API_URL;
 
 function TransactionHistory() {
   const [transactions, setTransactions] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [balanceData, setBalanceData] = useState([]);
   const [selectedAccount, setSelectedAccount] = useState(null);
 
@@ -31,14 +34,9 @@ function TransactionHistory() {
 
     const fetchTransactions = async () => {
       try {
-        const token = localStorage.getItem("accessToken");
-        const response = await axios.get(
-          `${backend_url}/api/gettransactions/`,
-          {
-            headers: { Authorization: `Bearer ${token}` },
-          }
-        );
-        setTransactions(response.data);
+        const page = await fetchTransactionPage();
+        setTransactions(page.results);
+        setNextPage(page.next);
       } catch (error) {
         console.error("Error fetching transactions:", error);
       }
@@ -48,6 +46,20 @@ function TransactionHistory() {
     fetchTransactions();
   }, []);
 
+  // Older transactions come one page at a time, following the API's `next` link
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchTransactionPage(nextPage);
+      setTransactions((loaded) => [...loaded, ...page.results]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error("Error fetching transactions:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filteredTransactions = transactions.filter(
     (transaction) => transaction.account === selectedAccount?.id
   );
@@ -113,7 +125,20 @@ function TransactionHistory() {
             </tbody>
           </table>
         ) : (
-          <p className="text-gray-500">No transactions for this account</p>
+          <p className="text-gray-500">
+            {nextPage
+              ? "No transactions for this account in the loaded history"
+              : "No transactions for this account"}
+          </p>
+        )}
+        {nextPage && (
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="mt-4 text-blue-500 disabled:text-gray-400"
+          >
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
         )}
       </div>
     </div>
@@ -0,0 +1,27 @@
+import axios from "axios";
+
+const backend_url = import.meta.env.VITE_APP_API_URL;
+
+// /api/gettransactions/ is keyset paginated: each page holds `results` and the
+// URL of the next page in `next` (null on the last page).
+
+export async function fetchTransactionPage(url = `${backend_url}/api/gettransactions/`) {
+  const token = localStorage.getItem("accessToken");
+  const response = await axios.get(url, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  return { results: response.data.results, next: response.data.next };
+}
+
+// Follows `next` until `count` rows pass `matches` or the history runs out.
+// Returns every row fetched and the URL to continue from.
+export async function fetchTransactionsUntil(count, matches = () => true) {
+  const results = [];
+  let page = await fetchTransactionPage();
+  results.push(...page.results);
+  while (page.next && results.filter(matches).length < count) {
+    page = await fetchTransactionPage(page.next);
+    results.push(...page.results);
+  }
+  return { results, next: page.next };
+}